@@ -0,0 +1,150 @@
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Optional, Tuple
+
+
+class Ticket:
+    """A queued or in-flight LLM request owned by one user"""
+
+    def __init__(self, user: str):
+        self.user = user
+        self.enqueued_at = time.monotonic()
+        self.admitted_at: Optional[float] = None
+
+    @property
+    def wait_time(self) -> float:
+        end = self.admitted_at if self.admitted_at is not None else time.monotonic()
+        return end - self.enqueued_at
+
+
+class AdmissionController:
+    """Bounded per-process queue for LLM work with one request per user"""
+
+    def __init__(self, max_in_flight: int = 4, max_queue: int = 32, max_wait: float = 15.0):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._cond = threading.Condition()
+        self._queue: Deque[Ticket] = deque()
+        self._in_flight = 0
+        self._users: Dict[str, Ticket] = {}
+
+    def enqueue(self, user: str) -> Tuple[Optional[Ticket], str]:
+        """Join the queue, or return a reason why the request was refused"""
+        with self._cond:
+            if user in self._users:
+                return None, "You already have a question being answered. Please wait for it to finish."
+            if len(self._queue) >= self.max_queue:
+                return None, "The tutor is at capacity right now."
+            ticket = Ticket(user)
+            self._users[user] = ticket
+            self._queue.append(ticket)
+            self._admit()
+            return ticket, ""
+
+    def position(self, ticket: Ticket) -> int:
+        """1-based queue position of the ticket (1 at the head, 0 once admitted or withdrawn)"""
+        with self._cond:
+            if ticket.admitted_at is not None:
+                return 0
+            try:
+                return self._queue.index(ticket) + 1
+            except ValueError:
+                return 0
+
+    def wait(self, ticket: Ticket, timeout: float) -> bool:
+        """Block up to timeout seconds for the ticket to be admitted"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while ticket.admitted_at is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def release(self, ticket: Ticket) -> None:
+        """Finish an in-flight ticket or withdraw a queued one"""
+        with self._cond:
+            if self._users.get(ticket.user) is not ticket:
+                return
+            del self._users[ticket.user]
+            if ticket.admitted_at is not None:
+                self._in_flight -= 1
+            else:
+                self._queue.remove(ticket)
+            self._admit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {"in_flight": self._in_flight, "queued": len(self._queue)}
+
+    def _admit(self) -> None:
+        # Caller must hold the condition lock
+        admitted = False
+        while self._queue and self._in_flight < self.max_in_flight:
+            ticket = self._queue.popleft()
+            ticket.admitted_at = time.monotonic()
+            self._in_flight += 1
+            admitted = True
+        if admitted:
+            self._cond.notify_all()
+
+
+class AnswerCache:
+    """Small LRU of recent tutor answers, used when the LLM is saturated"""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(subject: str, chapter: str, question: str) -> Tuple[str, str, str]:
+        return subject, chapter, " ".join(question.lower().split())
+
+    def get(self, subject: str, chapter: str, question: str) -> Optional[str]:
+        key = self._key(subject, chapter, question)
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, subject: str, chapter: str, question: str, answer: str) -> None:
+        key = self._key(subject, chapter, question)
+        with self._lock:
+            self._entries[key] = answer
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def chapter_summary(chapter: str, description: str, transcript) -> str:
+    """Build the precomputed fallback summary for a chapter"""
+    summary = f"**{chapter}**: {description}"
+    if isinstance(transcript, list) and transcript:
+        opening = " ".join(segment["text"] for segment in transcript[:15])
+        summary += f"\n\nFrom the lesson: {opening[:600]}..."
+    return summary
+
+
+def degraded_response(cached: Optional[str], summary: str) -> str:
+    """Response served when a request is shed instead of calling the LLM"""
+    if cached is not None:
+        return f"The tutor is very busy right now, so here is an earlier answer to the same question:\n\n{cached}"
+    return (
+        "The tutor is very busy right now. While you wait, here is a summary of this chapter:\n\n"
+        f"{summary}\n\nPlease try your question again in a moment."
+    )
+
+
+def controller_from_env() -> AdmissionController:
+    """Create a controller configured from LLM_* environment variables"""
+    return AdmissionController(
+        max_in_flight=int(os.getenv("LLM_MAX_IN_FLIGHT", "4")),
+        max_queue=int(os.getenv("LLM_MAX_QUEUE", "32")),
+        max_wait=float(os.getenv("LLM_MAX_WAIT_SECONDS", "15")),
+    )
@@ -0,0 +1,176 @@
+"""Pre-optimized image assets.
+
+At build time every image in ``images/`` is resized and re-encoded into
+``images/build/`` under a content-hashed name, and a size budget is enforced:
+
+    python assets.py build
+    python assets.py check --budget 100000
+
+Opaque images become JPEG and images with transparency become palette PNG.
+``st.image`` passes JPEG and PNG bytes through untouched; any other format
+(WebP included) is decoded and re-encoded on every rerun, so the budgeted
+bytes would never reach the browser.
+
+At runtime ``asset_bytes`` serves the optimized variant from an in-memory
+cache that is filled once per process. Streamlit serves image bytes under a
+URL derived from their hash, so unchanged assets keep the same URL across
+reruns and browsers can cache them.
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+import threading
+from typing import Dict, List
+
+SOURCE_DIR = 'images'
+BUILD_DIR = os.path.join(SOURCE_DIR, 'build')
+SOURCE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+# Sidebar images render at most ~300px wide; 2x covers high-DPI screens
+MAX_WIDTH = 600
+JPEG_QUALITY = 70
+VARIANT_EXTENSIONS = ('.jpg', '.png')
+SIZE_BUDGET = 100 * 1024
+
+_cache: Dict[str, bytes] = {}
+_loaded = False
+_lock = threading.Lock()
+
+
+def _sha256(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _source_paths(source_dir: str) -> List[str]:
+    return [os.path.join(source_dir, name) for name in sorted(os.listdir(source_dir))
+            if name.lower().endswith(SOURCE_EXTENSIONS)]
+
+
+def build(source_dir: str = SOURCE_DIR, build_dir: str = BUILD_DIR,
+          max_width: int = MAX_WIDTH, quality: int = JPEG_QUALITY) -> Dict[str, dict]:
+    """Generate resized JPEG/PNG variants and the manifest mapping sources to them"""
+    from PIL import Image
+
+    os.makedirs(build_dir, exist_ok=True)
+    manifest = {}
+    for path in _source_paths(source_dir):
+        with Image.open(path) as image:
+            image = image.convert('RGBA')
+            # An alpha channel that is fully opaque everywhere does not need PNG
+            if image.getchannel('A').getextrema()[0] == 255:
+                image = image.convert('RGB')
+            if image.width > max_width:
+                height = round(image.height * max_width / image.width)
+                image = image.resize((max_width, height), Image.LANCZOS)
+            buffer = io.BytesIO()
+            if image.mode == 'RGBA':
+                extension = 'png'
+                image.quantize(256, method=Image.FASTOCTREE).save(buffer, 'PNG', optimize=True)
+            else:
+                extension = 'jpg'
+                image.save(buffer, 'JPEG', quality=quality, optimize=True, progressive=True)
+            width, height = image.size
+
+        data = buffer.getvalue()
+        stem = os.path.splitext(os.path.basename(path))[0]
+        name = f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}.{extension}"
+        with open(os.path.join(build_dir, name), 'wb') as f:
+            f.write(data)
+        manifest[path.replace(os.sep, '/')] = {
+            'file': name,
+            'bytes': len(data),
+            'source_bytes': os.path.getsize(path),
+            'source_sha256': _sha256(path),
+            'width': width,
+            'height': height,
+        }
+
+    # Remove variants left over from previous builds
+    current = {entry['file'] for entry in manifest.values()}
+    for name in os.listdir(build_dir):
+        if name.endswith(VARIANT_EXTENSIONS) and name not in current:
+            os.remove(os.path.join(build_dir, name))
+
+    with open(os.path.join(build_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def check(budget: int = SIZE_BUDGET, source_dir: str = SOURCE_DIR, build_dir: str = BUILD_DIR) -> List[str]:
+    """Return problems with the built assets: missing or stale variants and budget overruns"""
+    try:
+        with open(os.path.join(build_dir, 'manifest.json'), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return ["No asset manifest found; run `python assets.py build` first"]
+
+    problems = []
+    for path in _source_paths(source_dir):
+        entry = manifest.get(path.replace(os.sep, '/'))
+        if entry is None or not os.path.exists(os.path.join(build_dir, entry['file'])):
+            problems.append(f"{path}: no optimized variant; rebuild assets")
+        elif entry.get('source_sha256') != _sha256(path):
+            problems.append(f"{path}: source changed since {entry['file']} was built; rebuild assets")
+        elif entry['bytes'] > budget:
+            problems.append(f"{path}: {entry['file']} is {entry['bytes']:,} bytes, over the {budget:,} byte budget")
+    return problems
+
+
+def _load(build_dir: str = BUILD_DIR) -> None:
+    # Caller must hold the lock. Unreadable or stale builds fall back to the originals.
+    global _loaded
+    try:
+        with open(os.path.join(build_dir, 'manifest.json'), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    for path, entry in manifest.items():
+        try:
+            if entry['source_sha256'] != _sha256(path):
+                continue
+            with open(os.path.join(build_dir, entry['file']), 'rb') as f:
+                _cache[path] = f.read()
+        except (OSError, KeyError, TypeError):
+            continue
+    _loaded = True
+
+
+def asset_bytes(path: str) -> bytes:
+    """Optimized image bytes for a path under images/, cached for the process"""
+    with _lock:
+        if not _loaded:
+            _load()
+        if path not in _cache:
+            # Not built (e.g. running from a fresh checkout): serve the original once read
+            with open(path, 'rb') as f:
+                _cache[path] = f.read()
+        return _cache[path]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build and check optimized image assets")
+    parser.add_argument('command', choices=['build', 'check'])
+    parser.add_argument('--budget', type=int, default=SIZE_BUDGET, help="maximum bytes per optimized asset")
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        manifest = build()
+        for path, entry in sorted(manifest.items()):
+            print(f"{path}: {entry['source_bytes']:,} -> {entry['bytes']:,} bytes ({entry['file']})")
+        return 0
+
+    problems = check(args.budget)
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    if problems:
+        return 1
+    print(f"All assets are within the {args.budget:,} byte budget")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
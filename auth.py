@@ -1,13 +1,21 @@
 import streamlit as st
 import sqlite3
 import hashlib
+import os
 from typing import Tuple, Optional
 
+DB_PATH = 'users.db'
+
 def init_db():
-    conn = sqlite3.connect('users.db')
+    conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
     c.execute('''CREATE TABLE IF NOT EXISTS users
-                 (username TEXT PRIMARY KEY, password TEXT)''')
+                 (username TEXT PRIMARY KEY, password TEXT, class_name TEXT)''')
+    
+    # Add the class column to databases created before classes existed
+    columns = [row[1] for row in c.execute('PRAGMA table_info(users)')]
+    if 'class_name' not in columns:
+        c.execute('ALTER TABLE users ADD COLUMN class_name TEXT')
     conn.commit()
     conn.close()
 
@@ -18,7 +26,7 @@ def sign_up(username: str, password: str) -> Tuple[bool, str]:
     if not username or not password:
         return False, "Please provide both username and password"
     
-    conn = sqlite3.connect('users.db')
+    conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
     
     # Check if username already exists
@@ -29,7 +37,7 @@ def sign_up(username: str, password: str) -> Tuple[bool, str]:
     
     # Insert new user
     hashed_password = hash_password(password)
-    c.execute('INSERT INTO users VALUES (?, ?)', (username, hashed_password))
+    c.execute('INSERT INTO users (username, password) VALUES (?, ?)', (username, hashed_password))
     conn.commit()
     conn.close()
     return True, "Sign up successful!"
@@ -38,7 +46,7 @@ def sign_in(username: str, password: str) -> Tuple[bool, str]:
     if not username or not password:
         return False, "Please provide both username and password"
     
-    conn = sqlite3.connect('users.db')
+    conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
     
     # Check credentials
@@ -53,6 +61,11 @@ def sign_in(username: str, password: str) -> Tuple[bool, str]:
         return True, "Sign in successful!"
     return False, "Invalid username or password"
 
+def is_instructor(username: Optional[str]) -> bool:
+    """Instructors are listed in the comma-separated INSTRUCTORS variable"""
+    instructors = {name.strip() for name in os.getenv('INSTRUCTORS', '').split(',') if name.strip()}
+    return username in instructors
+
 def show_login_page() -> None:
     st.title("🎓 Edusphere Login")
     
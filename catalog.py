@@ -0,0 +1,131 @@
+"""Subjects, chapters and lesson videos offered by Edusphere"""
+
+# Subject images dictionary
+subject_images = {
+    "Mathematics": "images/maths.jpg",
+    "Physics": "images/physics.jpg",
+    "Chemistry": "images/chemistry.jpg",
+    "Biology": "images/biology.jpg",
+    "History": "images/history.jpg",
+    "Literature": "images/literature.jpg",
+    "Computer Science": "images/computer.jpg"
+}
+
+# Subject chapters dictionary
+subject_chapters = {
+    "Mathematics": [
+        {"title": "Algebra", "description": "Study of mathematical symbols and rules for manipulating these symbols."},
+        {"title": "Geometry", "description": "Study of shapes, sizes, and properties of space."},
+        {"title": "Calculus", "description": "Study of change and motion, using derivatives and integrals."},
+        {"title": "Statistics", "description": "Study of data collection, analysis, interpretation, and presentation."},
+        {"title": "Trigonometry", "description": "Study of relationships between the angles and sides of triangles."}
+    ],
+    "Physics": [
+        {"title": "Mechanics", "description": "Study of motion and forces."},
+        {"title": "Thermodynamics", "description": "Study of heat and temperature and their relation to energy and work."},
+        {"title": "Electromagnetism", "description": "Study of electric charges, electric and magnetic fields."},
+        {"title": "Optics", "description": "Study of light and its interactions with matter."},
+        {"title": "Quantum Physics", "description": "Study of the behavior of matter and energy at the atomic and subatomic levels."}
+    ],
+    "Chemistry": [
+        {"title": "Organic Chemistry", "description": "Study of the structure, properties, and reactions of organic compounds."},
+        {"title": "Inorganic Chemistry", "description": "Study of inorganic compounds, typically those that do not contain carbon."},
+        {"title": "Physical Chemistry", "description": "Study of how matter behaves on a molecular and atomic level."},
+        {"title": "Analytical Chemistry", "description": "Study of the composition of materials."},
+        {"title": "Biochemistry", "description": "Study of chemical processes within and relating to living organisms."}
+    ],
+    "Biology": [
+        {"title": "Cell Biology", "description": "Study of the structure and function of cells."},
+        {"title": "Genetics", "description": "Study of heredity and the variation of inherited characteristics."},
+        {"title": "Evolution", "description": "Study of the processes that have led to the diversity of life."},
+        {"title": "Ecology", "description": "Study of interactions between organisms and their environment."},
+        {"title": "Human Anatomy", "description": "Study of the structure of the human body."}
+    ],
+    "History": [
+        {"title": "Ancient Civilizations", "description": "Study of early human societies and their cultures."},
+        {"title": "Middle Ages", "description": "Study of the period in European history from the 5th to the late 15th century."},
+        {"title": "Renaissance", "description": "Study of the revival of art and literature under the influence of classical models."},
+        {"title": "Modern History", "description": "Study of the history of the world from the late 15th century to the present."},
+        {"title": "Contemporary History", "description": "Study of recent history, typically from the end of World War II to the present."}
+    ],
+    "Literature": [
+        {"title": "Poetry", "description": "Study of literary work in which the expression of feelings and ideas is given intensity by the use of distinctive style and rhythm."},
+        {"title": "Drama", "description": "Study of plays and the performance of plays."},
+        {"title": "Fiction", "description": "Study of literature created from the imagination."},
+        {"title": "Non-Fiction", "description": "Study of factual accounts and real events."},
+        {"title": "Literary Criticism", "description": "Study of the analysis, interpretation, and evaluation of literature."}
+    ],
+    "Computer Science": [
+        {"title": "Programming Basics", "description": "Study of fundamental programming concepts and techniques."},
+        {"title": "Data Structures", "description": "Study of data organization, management, and storage formats."},
+        {"title": "Algorithms", "description": "Study of step-by-step procedures for calculations."},
+        {"title": "Web Development", "description": "Study of building and maintaining websites."},
+        {"title": "Machine Learning", "description": "Study of algorithms that improve automatically through experience."}
+    ]
+}
+
+# Chapter videos dictionary
+chapter_videos = {
+    "Mathematics": [
+        "https://www.youtube.com/embed/NybHckSEQBI?enablejsapi=1",  # Algebra
+        "https://www.youtube.com/embed/nwLEByAAqlM?enablejsapi=1",  # Geometry
+        "https://www.youtube.com/embed/UukVP7Mg3TU?enablejsapi=1",  # Calculus
+        "https://www.youtube.com/embed/sxQaBpKfDRk?enablejsapi=1",  # Statistics
+        "https://www.youtube.com/embed/T9lt6MZKLck?enablejsapi=1"   # Trigonometry
+    ],
+    "Physics": [
+        "https://www.youtube.com/embed/ZM8ECpBuQYE?enablejsapi=1",  # Mechanics
+        "https://www.youtube.com/embed/4PkiGQEQ_Pw?enablejsapi=1",  # Thermodynamics
+        "https://www.youtube.com/embed/x1-SibwIPM4?enablejsapi=1",  # Electromagnetism
+        "https://www.youtube.com/embed/7BXvc9W97iU?enablejsapi=1",  # Optics
+        "https://www.youtube.com/embed/Q1YqgPAtzho?enablejsapi=1"   # Quantum Physics
+    ],
+    "Chemistry": [
+        "https://www.youtube.com/embed/bka20Q9TN6M?enablejsapi=1",  # Organic Chemistry
+        "https://www.youtube.com/embed/6pUzPh_lCO8?enablejsapi=1",  # Inorganic Chemistry
+        "https://www.youtube.com/embed/cyhxvQN8SQ4?enablejsapi=1",  # Physical Chemistry
+        "https://www.youtube.com/embed/FSyAehMdpyI?enablejsapi=1",  # Analytical Chemistry
+        "https://www.youtube.com/embed/lJKNDXXV3vE?enablejsapi=1"   # Biochemistry
+    ],
+    "Biology": [
+        "https://www.youtube.com/embed/URUJD5NEXC8?enablejsapi=1",  # Cell Biology
+        "https://www.youtube.com/embed/v8tJGlicgp8?enablejsapi=1",  # Genetics
+        "https://www.youtube.com/embed/GhHOjC4oxh8?enablejsapi=1", # Evolution
+        "https://www.youtube.com/embed/9dAcEBXAFoo?enablejsapi=1",  # Ecology
+        "https://www.youtube.com/embed/Ae4MadKPJC0?enablejsapi=1"   # Human Anatomy
+    ],
+    "History": [
+        "https://www.youtube.com/embed/wX6J0Gd2EC8?enablejsapi=1",  # Ancient Civilizations
+        "https://www.youtube.com/embed/H5AVPmAZ8o8?enablejsapi=1",  # Middle Ages
+        "https://www.youtube.com/embed/Vufba_ZcoR0?enablejsapi=1",  # Renaissance
+        "https://www.youtube.com/embed/kUWEYLVooxU?enablejsapi=1",  # Modern History
+        "https://www.youtube.com/embed/T5PwyuzSYcs?enablejsapi=1"  # Contemporary History
+    ],
+    "Literature": [
+        "https://www.youtube.com/embed/drPoZMqHTAw?enablejsapi=1",  # Poetry
+        "https://www.youtube.com/embed/3CvJKTChsl4?enablejsapi=1",  # Drama
+        "https://www.youtube.com/embed/QrUPneyZNf0?enablejsapi=1",  # Fiction
+        "https://www.youtube.com/embed/QrUPneyZNf0?enablejsapi=1",  # Non-Fiction
+        "https://www.youtube.com/embed/3naf-KE0uvI?enablejsapi=1"   # Literary Criticism
+    ],
+    "Computer Science": [
+        "https://www.youtube.com/embed/l26oaHV7D40?enablejsapi=1",  # Programming Basics
+        "https://www.youtube.com/embed/DuDz6B4cqVc?enablejsapi=1",  # Data Structures
+        "https://www.youtube.com/embed/rL8X2mlNHPM?enablejsapi=1",  # Algorithms
+        "https://www.youtube.com/embed/ysEN5RaKOlA?enablejsapi=1",  # Web Development
+        "https://www.youtube.com/embed/PeMlggyqz0Y?enablejsapi=1"  # Machine Learning
+    ] 
+}
+
+
+def get_video_id(url):
+    """Extract video ID from YouTube URL"""
+    if 'embed/' in url:
+        # Extract ID from embed URL
+        return url.split('embed/')[-1].split('?')[0]
+    elif 'youtu.be' in url:
+        # Extract ID from youtu.be URL
+        return url.split('/')[-1]
+    else:
+        # Extract ID from regular YouTube URL
+        return url.split('/')[-1]
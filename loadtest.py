@@ -0,0 +1,134 @@
+"""Overload test for the LLM admission controller.
+
+Simulates more concurrent students than the provider can serve and checks
+that the p99 queue wait stays bounded by the shedding threshold.
+
+    python loadtest.py --users 200 --latency 0.5
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+from typing import List
+
+from admission import AdmissionController
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run(users: int, requests_per_user: int, latency: float, controller: AdmissionController) -> int:
+    waits: List[float] = []
+    served_waits: List[float] = []
+    outcomes = {"served": 0, "shed": 0, "rejected": 0}
+    peaks = {"calls": 0, "in_flight": 0, "queued": 0}
+    violations: List[str] = []
+    active_calls = 0
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def student(name: str) -> None:
+        nonlocal active_calls
+        for _ in range(requests_per_user):
+            time.sleep(random.uniform(0, latency))
+            ticket, _ = controller.enqueue(name)
+            if ticket is None:
+                with lock:
+                    outcomes["rejected"] += 1
+                continue
+            try:
+                # A second request from the same student must be refused while this one is live
+                duplicate, _ = controller.enqueue(name)
+                if duplicate is not None:
+                    controller.release(duplicate)
+                    with lock:
+                        violations.append(f"{name} held two tickets at once")
+                admitted = controller.wait(ticket, controller.max_wait)
+                with lock:
+                    waits.append(ticket.wait_time)
+                    if admitted:
+                        served_waits.append(ticket.wait_time)
+                    outcomes["served" if admitted else "shed"] += 1
+                if admitted:
+                    with lock:
+                        active_calls += 1
+                        peaks["calls"] = max(peaks["calls"], active_calls)
+                    # Simulated slow provider
+                    time.sleep(random.uniform(0.5 * latency, 1.5 * latency))
+                    with lock:
+                        active_calls -= 1
+            finally:
+                controller.release(ticket)
+
+    def monitor() -> None:
+        while not done.is_set():
+            stats = controller.stats()
+            peaks["in_flight"] = max(peaks["in_flight"], stats["in_flight"])
+            peaks["queued"] = max(peaks["queued"], stats["queued"])
+            time.sleep(0.001)
+
+    started = time.monotonic()
+    watcher = threading.Thread(target=monitor)
+    watcher.start()
+    threads = [threading.Thread(target=student, args=(f"student{i}",)) for i in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    done.set()
+    watcher.join()
+    elapsed = time.monotonic() - started
+
+    total = sum(outcomes.values())
+    print(f"requests: {total} in {elapsed:.1f}s  served: {outcomes['served']}  "
+          f"shed: {outcomes['shed']}  rejected: {outcomes['rejected']} "
+          f"({100 * outcomes['rejected'] / max(total, 1):.1f}% refused at enqueue)")
+    # Percentiles cover queued tickets only; immediate refusals never waited
+    if waits:
+        print(f"queue wait p50: {percentile(waits, 50):.2f}s  p99: {percentile(waits, 99):.2f}s  "
+              f"max: {max(waits):.2f}s  (threshold {controller.max_wait:.2f}s)")
+    if served_waits:
+        print(f"wait before service p50: {percentile(served_waits, 50):.2f}s  "
+              f"p99: {percentile(served_waits, 99):.2f}s")
+    print(f"peak in flight: {peaks['in_flight']} (limit {controller.max_in_flight}), "
+          f"peak concurrent calls: {peaks['calls']}, "
+          f"peak queued: {peaks['queued']} (limit {controller.max_queue})")
+
+    if peaks["in_flight"] > controller.max_in_flight or peaks["calls"] > controller.max_in_flight:
+        violations.append("in-flight requests exceeded max_in_flight")
+    if peaks["queued"] > controller.max_queue:
+        violations.append("queue length exceeded max_queue")
+    # Allow a little scheduler slack over the threshold
+    if waits and percentile(waits, 99) > controller.max_wait + 0.25:
+        violations.append("p99 queue wait exceeded the shedding threshold")
+
+    for violation in violations:
+        print(f"FAIL: {violation}")
+    if violations:
+        return 1
+    print("OK: limits held and queue wait is bounded")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--requests-per-user", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.5, help="mean simulated LLM latency in seconds")
+    parser.add_argument("--max-in-flight", type=int, default=4)
+    parser.add_argument("--max-queue", type=int, default=32)
+    parser.add_argument("--max-wait", type=float, default=2.0)
+    args = parser.parse_args()
+
+    controller = AdmissionController(args.max_in_flight, args.max_queue, args.max_wait)
+    return run(args.users, args.requests_per_user, args.latency, controller)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
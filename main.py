@@ -1,7 +1,13 @@
 import streamlit as st
 from openai import OpenAI
 from dotenv import load_dotenv
-from auth import init_db, show_login_page
+from auth import init_db, is_instructor, show_login_page
+from catalog import chapter_videos, get_video_id, subject_chapters, subject_images
+from assets import asset_bytes
+from admission import AnswerCache, chapter_summary, controller_from_env, degraded_response
+from transcript_index import TranscriptIndex
+from quiz import (chapter_summary_rows, class_summary_rows, init_quiz_db, parse_key_terms,
+                  parse_quiz_response, record_attempt)
 from youtube_transcript_api import YouTubeTranscriptApi
 from urllib.parse import urlparse
 import streamlit_scrollable_textbox as stx
@@ -14,32 +20,39 @@ load_dotenv()
 
 # Initialize the database
 init_db()
+init_quiz_db()
 
 
 
-def get_video_id(url):
-    """Extract video ID from YouTube URL"""
-    if 'embed/' in url:
-        # Extract ID from embed URL
-        return url.split('embed/')[-1].split('?')[0]
-    elif 'youtu.be' in url:
-        # Extract ID from youtu.be URL
-        return url.split('/')[-1]
-    else:
-        # Extract ID from regular YouTube URL
-        return url.split('/')[-1]
+@st.cache_data(show_spinner=False)
+def fetch_transcript(video_id):
+    """Fetch and cache a transcript; failures are raised so they are not cached"""
+    return YouTubeTranscriptApi.get_transcript(video_id)
 
 def get_transcript(video_url):
     """Get transcript of YouTube video with timestamps"""
     try:
         video_id = get_video_id(video_url)
-        transcript_list = YouTubeTranscriptApi.get_transcript(video_id)
+        transcript_list = fetch_transcript(video_id)
         # Keep the timestamp information
         return transcript_list
     except Exception as e:
         return f"Transcript not available: {str(e)}"
 
-def create_video_player(video_id, height=450):
+@st.cache_resource
+def get_transcript_index():
+    """Process-wide transcript search index, memory-mapped from disk"""
+    return TranscriptIndex()
+
+def jump_to_segment(subject, chapter, start):
+    """Switch to a chapter and start its video at the given time"""
+    st.session_state.subject_selector = subject
+    st.session_state.previous_subject = subject
+    st.session_state.selected_chapter = chapter
+    st.session_state.video_start = {'subject': subject, 'chapter': chapter, 'time': int(start)}
+    st.session_state.video_time_update = {'time': start}
+
+def create_video_player(video_id, height=450, start=0):
     """Create a video player with progress tracking"""
     # Add the greeting to session state messages when a new chapter is selected
     if 'messages' in st.session_state:
@@ -61,7 +74,7 @@ def create_video_player(video_id, height=450):
         <iframe id="youtube-iframe" 
                 width="100%" 
                 height="{height}" 
-                src="https://www.youtube.com/embed/{video_id}?enablejsapi=1" 
+                src="https://www.youtube.com/embed/{video_id}?enablejsapi=1&start={start}" 
                 frameborder="0" 
                 allow="accelerometer; autoplay; clipboard-write; encrypted-media; gyroscope; picture-in-picture" 
                 allowfullscreen>
@@ -134,7 +147,28 @@ def process_chat_stream(stream) -> str:
             full_response += chunk.choices[0].delta.content
     return full_response
 
+@st.cache_resource
+def get_admission_controller():
+    """Process-wide admission controller for LLM requests"""
+    return controller_from_env()
 
+@st.cache_resource
+def get_answer_cache():
+    """Process-wide cache of recent tutor answers"""
+    return AnswerCache()
+
+def wait_for_admission(admission, ticket, placeholder) -> bool:
+    """Wait for an LLM slot, showing the queue position while waiting"""
+    deadline = time.monotonic() + admission.max_wait
+    while True:
+        position = admission.position(ticket)
+        if position:
+            placeholder.write(f"The tutor is busy. You are #{position} in the queue...")
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        if admission.wait(ticket, min(1.0, remaining)):
+            return True
 
 
 # Set up the page configuration
@@ -163,130 +197,13 @@ else:
     if 'quiz_data' not in st.session_state:
         st.session_state.quiz_data = None
 
-    # Subject images dictionary
-    subject_images = {
-        "Mathematics": "images/maths.jpg",
-        "Physics": "images/physics.jpg",
-        "Chemistry": "images/chemistry.jpg",
-        "Biology": "images/biology.jpg",
-        "History": "images/history.jpg",
-        "Literature": "images/literature.jpg",
-        "Computer Science": "images/computer.jpg"
-    }
-
-    # Subject chapters dictionary
-    subject_chapters = {
-        "Mathematics": [
-            {"title": "Algebra", "description": "Study of mathematical symbols and rules for manipulating these symbols."},
-            {"title": "Geometry", "description": "Study of shapes, sizes, and properties of space."},
-            {"title": "Calculus", "description": "Study of change and motion, using derivatives and integrals."},
-            {"title": "Statistics", "description": "Study of data collection, analysis, interpretation, and presentation."},
-            {"title": "Trigonometry", "description": "Study of relationships between the angles and sides of triangles."}
-        ],
-        "Physics": [
-            {"title": "Mechanics", "description": "Study of motion and forces."},
-            {"title": "Thermodynamics", "description": "Study of heat and temperature and their relation to energy and work."},
-            {"title": "Electromagnetism", "description": "Study of electric charges, electric and magnetic fields."},
-            {"title": "Optics", "description": "Study of light and its interactions with matter."},
-            {"title": "Quantum Physics", "description": "Study of the behavior of matter and energy at the atomic and subatomic levels."}
-        ],
-        "Chemistry": [
-            {"title": "Organic Chemistry", "description": "Study of the structure, properties, and reactions of organic compounds."},
-            {"title": "Inorganic Chemistry", "description": "Study of inorganic compounds, typically those that do not contain carbon."},
-            {"title": "Physical Chemistry", "description": "Study of how matter behaves on a molecular and atomic level."},
-            {"title": "Analytical Chemistry", "description": "Study of the composition of materials."},
-            {"title": "Biochemistry", "description": "Study of chemical processes within and relating to living organisms."}
-        ],
-        "Biology": [
-            {"title": "Cell Biology", "description": "Study of the structure and function of cells."},
-            {"title": "Genetics", "description": "Study of heredity and the variation of inherited characteristics."},
-            {"title": "Evolution", "description": "Study of the processes that have led to the diversity of life."},
-            {"title": "Ecology", "description": "Study of interactions between organisms and their environment."},
-            {"title": "Human Anatomy", "description": "Study of the structure of the human body."}
-        ],
-        "History": [
-            {"title": "Ancient Civilizations", "description": "Study of early human societies and their cultures."},
-            {"title": "Middle Ages", "description": "Study of the period in European history from the 5th to the late 15th century."},
-            {"title": "Renaissance", "description": "Study of the revival of art and literature under the influence of classical models."},
-            {"title": "Modern History", "description": "Study of the history of the world from the late 15th century to the present."},
-            {"title": "Contemporary History", "description": "Study of recent history, typically from the end of World War II to the present."}
-        ],
-        "Literature": [
-            {"title": "Poetry", "description": "Study of literary work in which the expression of feelings and ideas is given intensity by the use of distinctive style and rhythm."},
-            {"title": "Drama", "description": "Study of plays and the performance of plays."},
-            {"title": "Fiction", "description": "Study of literature created from the imagination."},
-            {"title": "Non-Fiction", "description": "Study of factual accounts and real events."},
-            {"title": "Literary Criticism", "description": "Study of the analysis, interpretation, and evaluation of literature."}
-        ],
-        "Computer Science": [
-            {"title": "Programming Basics", "description": "Study of fundamental programming concepts and techniques."},
-            {"title": "Data Structures", "description": "Study of data organization, management, and storage formats."},
-            {"title": "Algorithms", "description": "Study of step-by-step procedures for calculations."},
-            {"title": "Web Development", "description": "Study of building and maintaining websites."},
-            {"title": "Machine Learning", "description": "Study of algorithms that improve automatically through experience."}
-        ]
-    }
-
-    # Chapter videos dictionary
-    chapter_videos = {
-        "Mathematics": [
-            "https://www.youtube.com/embed/NybHckSEQBI?enablejsapi=1",  # Algebra
-            "https://www.youtube.com/embed/nwLEByAAqlM?enablejsapi=1",  # Geometry
-            "https://www.youtube.com/embed/UukVP7Mg3TU?enablejsapi=1",  # Calculus
-            "https://www.youtube.com/embed/sxQaBpKfDRk?enablejsapi=1",  # Statistics
-            "https://www.youtube.com/embed/T9lt6MZKLck?enablejsapi=1"   # Trigonometry
-        ],
-        "Physics": [
-            "https://www.youtube.com/embed/ZM8ECpBuQYE?enablejsapi=1",  # Mechanics
-            "https://www.youtube.com/embed/4PkiGQEQ_Pw?enablejsapi=1",  # Thermodynamics
-            "https://www.youtube.com/embed/x1-SibwIPM4?enablejsapi=1",  # Electromagnetism
-            "https://www.youtube.com/embed/7BXvc9W97iU?enablejsapi=1",  # Optics
-            "https://www.youtube.com/embed/Q1YqgPAtzho?enablejsapi=1"   # Quantum Physics
-        ],
-        "Chemistry": [
-            "https://www.youtube.com/embed/bka20Q9TN6M?enablejsapi=1",  # Organic Chemistry
-            "https://www.youtube.com/embed/6pUzPh_lCO8?enablejsapi=1",  # Inorganic Chemistry
-            "https://www.youtube.com/embed/cyhxvQN8SQ4?enablejsapi=1",  # Physical Chemistry
-            "https://www.youtube.com/embed/FSyAehMdpyI?enablejsapi=1",  # Analytical Chemistry
-            "https://www.youtube.com/embed/lJKNDXXV3vE?enablejsapi=1"   # Biochemistry
-        ],
-        "Biology": [
-            "https://www.youtube.com/embed/URUJD5NEXC8?enablejsapi=1",  # Cell Biology
-            "https://www.youtube.com/embed/v8tJGlicgp8?enablejsapi=1",  # Genetics
-            "https://www.youtube.com/embed/GhHOjC4oxh8?enablejsapi=1", # Evolution
-            "https://www.youtube.com/embed/9dAcEBXAFoo?enablejsapi=1",  # Ecology
-            "https://www.youtube.com/embed/Ae4MadKPJC0?enablejsapi=1"   # Human Anatomy
-        ],
-        "History": [
-            "https://www.youtube.com/embed/wX6J0Gd2EC8?enablejsapi=1",  # Ancient Civilizations
-            "https://www.youtube.com/embed/H5AVPmAZ8o8?enablejsapi=1",  # Middle Ages
-            "https://www.youtube.com/embed/Vufba_ZcoR0?enablejsapi=1",  # Renaissance
-            "https://www.youtube.com/embed/kUWEYLVooxU?enablejsapi=1",  # Modern History
-            "https://www.youtube.com/embed/T5PwyuzSYcs?enablejsapi=1"  # Contemporary History
-        ],
-        "Literature": [
-            "https://www.youtube.com/embed/drPoZMqHTAw?enablejsapi=1",  # Poetry
-            "https://www.youtube.com/embed/3CvJKTChsl4?enablejsapi=1",  # Drama
-            "https://www.youtube.com/embed/QrUPneyZNf0?enablejsapi=1",  # Fiction
-            "https://www.youtube.com/embed/QrUPneyZNf0?enablejsapi=1",  # Non-Fiction
-            "https://www.youtube.com/embed/3naf-KE0uvI?enablejsapi=1"   # Literary Criticism
-        ],
-        "Computer Science": [
-            "https://www.youtube.com/embed/l26oaHV7D40?enablejsapi=1",  # Programming Basics
-            "https://www.youtube.com/embed/DuDz6B4cqVc?enablejsapi=1",  # Data Structures
-            "https://www.youtube.com/embed/rL8X2mlNHPM?enablejsapi=1",  # Algorithms
-            "https://www.youtube.com/embed/ysEN5RaKOlA?enablejsapi=1",  # Web Development
-            "https://www.youtube.com/embed/PeMlggyqz0Y?enablejsapi=1"  # Machine Learning
-        ] 
-    }
-
     # Subject selection
     subjects = list(subject_images.keys())
     
     # Sidebar for subject selection
     with st.sidebar:
         #st.header("Management Science University")
-        st.image("images/msu.webp")
+        st.image(asset_bytes("images/msu.webp"))
         st.markdown("""""")
         
         
@@ -303,7 +220,7 @@ else:
         
          # Display subject image
         if selected_subject:
-            st.image(subject_images[selected_subject], caption=f"{selected_subject} Subject", use_container_width=True)
+            st.image(asset_bytes(subject_images[selected_subject]), caption=f"{selected_subject} Subject", use_container_width=True)
 
         
         # When subject changes, set the first chapter as default
@@ -320,6 +237,25 @@ else:
                     st.write(chapter["description"])
                     if st.button(f"Select {chapter['title']}", key=chapter["title"]):
                         st.session_state.selected_chapter = chapter["title"]  # Store selected chapter
+        
+        # Search across all indexed lesson transcripts
+        st.header("Search Lessons")
+        search_query = st.text_input("Search transcripts", key="transcript_search", placeholder="e.g. photosynthesis")
+        if search_query:
+            results = get_transcript_index().search(search_query, limit=8)
+            if not results:
+                st.caption("No matching lessons found.")
+            for i, result in enumerate(results):
+                minutes = int(result['start'] // 60)
+                seconds = int(result['start'] % 60)
+                st.markdown(f"**{result['subject']} - {result['chapter']}** [{minutes:02d}:{seconds:02d}]")
+                st.caption(result['text'])
+                st.button(
+                    "Go to this moment",
+                    key=f"search_result_{i}",
+                    on_click=jump_to_segment,
+                    args=(result['subject'], result['chapter'], result['start'])
+                )
                         
         st.markdown(
         """
@@ -336,6 +272,14 @@ else:
         unsafe_allow_html=True)
         
         st.markdown("""""")
+        
+        # Instructor dashboard, served from the precomputed quiz rollups
+        if is_instructor(st.session_state.get('username')):
+            with st.expander("Class Analytics", expanded=False):
+                st.markdown("**By chapter**")
+                st.dataframe(chapter_summary_rows(), use_container_width=True)
+                st.markdown("**By class**")
+                st.dataframe(class_summary_rows(), use_container_width=True)
                         
         if st.button("Logout"):
             st.session_state.authenticated = False
@@ -375,11 +319,24 @@ else:
                 
                 video_url = chapter_videos[selected_subject][chapter_index]
                 video_id = get_video_id(video_url)
-                create_video_player(video_id)
+                
+                # Start from a search result's timestamp if one was chosen for this chapter
+                video_start = st.session_state.get('video_start') or {}
+                start = 0
+                if (video_start.get('subject') == selected_subject and 
+                    video_start.get('chapter') == st.session_state.selected_chapter):
+                    start = video_start['time']
+                create_video_player(video_id, start=start)
 
                 # Get transcript data
                 transcript_data = get_transcript(video_url)
                 
+                # Add the transcript to the search index the first time it is cached
+                if isinstance(transcript_data, list):
+                    transcript_index = get_transcript_index()
+                    if not transcript_index.has(video_id):
+                        transcript_index.add(selected_subject, st.session_state.selected_chapter, video_id, transcript_data)
+                
             except StopIteration:
                 st.error("Selected chapter not found.")
         st.markdown('</div>', unsafe_allow_html=True)
@@ -441,10 +398,15 @@ else:
                     current_subject = st.session_state.get('previous_subject')
                     current_chapter = st.session_state.selected_chapter
                     
+                    # A failed or shed quiz is not retried on every rerun, only when the student asks
+                    quiz_unavailable = st.session_state.get('quiz_unavailable') or {}
+                    
                     # Generate quiz only if it doesn't exist for current chapter or chapter has changed
-                    if (st.session_state.quiz_data is None or 
-                        st.session_state.quiz_data.get('chapter') != current_chapter):
+                    if ((st.session_state.quiz_data is None or 
+                         st.session_state.quiz_data.get('chapter') != current_chapter) and
+                        quiz_unavailable.get('chapter') != current_chapter):
                         
+                        admission, ticket = None, None
                         try:
                             chapter_index = next(
                                 i for i, chapter in enumerate(subject_chapters[current_subject]) 
@@ -453,6 +415,15 @@ else:
                             transcript_data = get_transcript(chapter_videos[current_subject][chapter_index])
                             
                             if isinstance(transcript_data, list):
+                                # Wait for an LLM slot before generating the quiz
+                                admission = get_admission_controller()
+                                ticket, reason = admission.enqueue(st.session_state.get('username') or 'anonymous')
+                                quiz_placeholder = st.empty()
+                                admitted = ticket is not None and wait_for_admission(admission, ticket, quiz_placeholder)
+                                quiz_placeholder.empty()
+                                if not admitted:
+                                    raise RuntimeError(reason or "The tutor is busy right now.")
+                                
                                 # Combine transcript text for context
                                 transcript_text = " ".join([segment["text"] for segment in transcript_data])
                                 
@@ -468,6 +439,7 @@ else:
                                 B: [Second option]
                                 C: [Third option]
                                 D: [Fourth option]
+                                ANSWER: [Letter of the correct option]
                                 
                                 Make the question sound natural as if asked in a classroom setting.
                                 Do not mention transcripts or videos in the question."""
@@ -479,37 +451,53 @@ else:
                                     temperature=0.7
                                 ).choices[0].message.content
                                 
-                                # Split the response into question and options
-                                response_parts = quiz_response.split('\n')
-                                question = response_parts[0].replace('QUESTION: ', '')
-                                options = [opt.split(': ')[1] for opt in response_parts[1:5]]
+                                # Split the response into question, options and answer key
+                                question, options, answer = parse_quiz_response(quiz_response)
                                 
                                 # Generate key terms
                                 key_terms_context = f"""As a {current_subject} lecturer teaching about {current_chapter},
                                 based on this lesson content:
                                 {transcript_text[:1000]}
                                 
-                                List 4 key terms or concepts that were covered in the lesson.
-                                Make sure each term is a single line and clearly relevant to {current_chapter}."""
+                                List 4 key terms or concepts that were covered in the lesson, and 2 plausible
+                                terms from {current_subject} that were not covered.
+                                Put each term on its own line, formatted as follows:
+                                COVERED: [Term covered in the lesson]
+                                DISTRACTOR: [Term not covered in the lesson]"""
                                 
                                 key_terms_response = client.chat.completions.create(
                                     model="gpt-4o-mini",
                                     messages=[{"role": "system", "content": key_terms_context}],
                                     temperature=0.7
-                                ).choices[0].message.content.split('\n')
+                                ).choices[0].message.content
+                                key_terms, distractors = parse_key_terms(key_terms_response)
                                 
-                                # Store quiz data in session state
+                                # Store quiz data and answer key in session state
                                 st.session_state.quiz_data = {
                                     'chapter': current_chapter,
                                     'question': question,
                                     'options': options,
-                                    'key_terms': key_terms_response
+                                    'answer': answer,
+                                    'key_terms': key_terms,
+                                    'distractors': distractors,
+                                    'term_options': sorted(key_terms + distractors)
                                 }
                             else:
                                 st.error("Could not generate quiz: Transcript not available")
                                 
                         except Exception as e:
-                            st.error(f"Could not generate quiz: {str(e)}")
+                            st.session_state.quiz_unavailable = {'chapter': current_chapter, 'reason': str(e)}
+                        finally:
+                            if ticket is not None:
+                                admission.release(ticket)
+                    
+                    # Show why the quiz is unavailable and let the student retry
+                    quiz_unavailable = st.session_state.get('quiz_unavailable') or {}
+                    if quiz_unavailable.get('chapter') == current_chapter:
+                        st.info(f"The quiz is unavailable right now: {quiz_unavailable['reason']}")
+                        if st.button("Retry quiz", key="retry_quiz"):
+                            st.session_state.quiz_unavailable = None
+                            st.rerun()
                     
                     # Display quiz using stored data
                     if st.session_state.quiz_data and st.session_state.quiz_data['chapter'] == current_chapter:
@@ -537,15 +525,29 @@ else:
                         st.write("Select all key terms that were covered in this lesson:")
                         q3 = st.multiselect(
                             "Select terms:",
-                            st.session_state.quiz_data['key_terms'],
+                            st.session_state.quiz_data['term_options'],
                             key="q3"
                         )
                         
                         if st.button("Submit Quiz", key="submit_quiz"):
+                            # Grade locally and store the attempt with its answer key
+                            grade = record_attempt(
+                                st.session_state.get('username') or 'anonymous',
+                                current_subject,
+                                current_chapter,
+                                st.session_state.quiz_data,
+                                q1, q2, q3
+                            )
                             st.success("Quiz submitted successfully!")
+                            if grade['mcq_correct']:
+                                feedback = "You got the multiple choice question right."
+                            else:
+                                feedback = f"The correct answer to Question 1 was: {st.session_state.quiz_data['answer']}."
                             st.session_state.messages.append({
                                 "role": "assistant",
-                                "content": "Great job completing the quiz! Do you have any questions about the topics covered?"
+                                "content": f"Great job completing the quiz! You scored {grade['score']:.0%}. {feedback} "
+                                           f"The key terms covered were: {', '.join(st.session_state.quiz_data['key_terms'])}. "
+                                           "Do you have any questions about the topics covered?"
                             })
                             st.rerun()
 
@@ -594,20 +596,36 @@ else:
             *[msg for msg in st.session_state.messages[-5:]]
         ]
         
+        admission = get_admission_controller()
+        answer_cache = get_answer_cache()
+        
         with st.chat_message("assistant"):
+            # Join the LLM queue; one in-flight request per student
+            ticket, reason = admission.enqueue(st.session_state.get('username') or 'anonymous')
             try:
                 # Show temporary "thinking" message
                 thinking_placeholder = st.empty()
                 thinking_placeholder.write("Thinking...")
                 
-                stream = client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=[{"role": m["role"], "content": m["content"]} for m in full_prompt],
-                    temperature=0.7,
-                    stream=True,
-                )
-                
-                response = process_chat_stream(stream)
+                if ticket is not None and wait_for_admission(admission, ticket, thinking_placeholder):
+                    thinking_placeholder.write("Thinking...")
+                    stream = client.chat.completions.create(
+                        model="gpt-4o-mini",
+                        messages=[{"role": m["role"], "content": m["content"]} for m in full_prompt],
+                        temperature=0.7,
+                        stream=True,
+                    )
+                    
+                    response = process_chat_stream(stream)
+                    answer_cache.put(current_subject, current_chapter, prompt, response)
+                else:
+                    # Shed load: serve a cached answer or the chapter summary instead
+                    if reason:
+                        st.info(reason)
+                    response = degraded_response(
+                        answer_cache.get(current_subject, current_chapter, prompt),
+                        chapter_summary(current_chapter, chapter_description, video_transcript)
+                    )
                 
                 # Clear thinking message and show response
                 thinking_placeholder.empty()
@@ -620,6 +638,8 @@ else:
                 st.error(f"Error generating response: {str(e)}")
             
             finally:
+                if ticket is not None:
+                    admission.release(ticket)
                 # Re-enable the input
                 st.session_state.processing = False
 
@@ -0,0 +1,305 @@
+import json
+import re
+import sqlite3
+import time
+from typing import Dict, List, Optional, Tuple
+
+from auth import DB_PATH
+from tokenizer import tokenize
+
+UNASSIGNED_CLASS = 'Unassigned'
+
+_OPTION_RE = re.compile(r'^\(?([A-D])[:.)]\s*(.+)$')
+_ANSWER_RE = re.compile(r'^ANSWER:\s*\(?([A-D])\b', re.IGNORECASE)
+_TERM_PREFIX_RE = re.compile(r'^\s*(?:[-*•]|\d+[.)])\s*')
+
+
+def _clean_line(line: str) -> str:
+    """Drop markdown emphasis the model often adds, e.g. **QUESTION:**"""
+    return line.replace('**', '').strip().strip('*').strip()
+
+
+def connect() -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    # WAL lets the dashboard read rollups while attempts are being written
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    return conn
+
+
+def init_quiz_db():
+    conn = connect()
+    c = conn.cursor()
+    c.execute('''CREATE TABLE IF NOT EXISTS quiz_attempts
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  username TEXT NOT NULL,
+                  class_name TEXT NOT NULL,
+                  subject TEXT NOT NULL,
+                  chapter TEXT NOT NULL,
+                  quiz TEXT NOT NULL,
+                  responses TEXT NOT NULL,
+                  mcq_correct INTEGER NOT NULL,
+                  terms_score REAL NOT NULL,
+                  reflection_score REAL NOT NULL,
+                  score REAL NOT NULL,
+                  submitted_at REAL NOT NULL)''')
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_quiz_attempts_user
+                 ON quiz_attempts (username, submitted_at)''')
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_quiz_attempts_chapter
+                 ON quiz_attempts (subject, chapter, class_name, submitted_at)''')
+
+    # Rollups are maintained on every submission so the dashboard never scans attempts
+    c.execute('''CREATE TABLE IF NOT EXISTS quiz_student_rollups
+                 (subject TEXT NOT NULL,
+                  chapter TEXT NOT NULL,
+                  username TEXT NOT NULL,
+                  class_name TEXT NOT NULL,
+                  attempts INTEGER NOT NULL,
+                  best_score REAL NOT NULL,
+                  last_score REAL NOT NULL,
+                  last_attempt REAL NOT NULL,
+                  PRIMARY KEY (subject, chapter, username)) WITHOUT ROWID''')
+    # One row per student per class and chapter, so a student who moves class
+    # is counted once in each class they attempted the quiz in
+    c.execute('''CREATE TABLE IF NOT EXISTS quiz_class_members
+                 (class_name TEXT NOT NULL,
+                  subject TEXT NOT NULL,
+                  chapter TEXT NOT NULL,
+                  username TEXT NOT NULL,
+                  PRIMARY KEY (class_name, subject, chapter, username)) WITHOUT ROWID''')
+    c.execute('''CREATE TABLE IF NOT EXISTS quiz_chapter_rollups
+                 (subject TEXT NOT NULL,
+                  chapter TEXT NOT NULL,
+                  attempts INTEGER NOT NULL,
+                  students INTEGER NOT NULL,
+                  mcq_correct INTEGER NOT NULL,
+                  score_sum REAL NOT NULL,
+                  last_attempt REAL NOT NULL,
+                  PRIMARY KEY (subject, chapter)) WITHOUT ROWID''')
+    c.execute('''CREATE TABLE IF NOT EXISTS quiz_class_rollups
+                 (class_name TEXT NOT NULL,
+                  subject TEXT NOT NULL,
+                  chapter TEXT NOT NULL,
+                  attempts INTEGER NOT NULL,
+                  students INTEGER NOT NULL,
+                  mcq_correct INTEGER NOT NULL,
+                  score_sum REAL NOT NULL,
+                  last_attempt REAL NOT NULL,
+                  PRIMARY KEY (class_name, subject, chapter)) WITHOUT ROWID''')
+    conn.commit()
+    conn.close()
+
+
+def parse_quiz_response(text: str) -> Tuple[str, List[str], str]:
+    """Parse the generated question, its four options and the answer letter"""
+    question, options, answer = None, {}, None
+    for line in (_clean_line(line) for line in text.split('\n')):
+        if line.upper().startswith('QUESTION:'):
+            question = line.split(':', 1)[1].strip()
+        elif _ANSWER_RE.match(line):
+            answer = _ANSWER_RE.match(line).group(1).upper()
+        elif _OPTION_RE.match(line):
+            letter, option = _OPTION_RE.match(line).groups()
+            options[letter] = option.strip()
+
+    if not question or sorted(options) != ['A', 'B', 'C', 'D'] or answer is None:
+        raise ValueError("Quiz response was not in the expected format")
+    ordered = [options[letter] for letter in 'ABCD']
+    return question, ordered, options[answer]
+
+
+def parse_key_terms(text: str) -> Tuple[List[str], List[str]]:
+    """Split the generated term list into covered terms and distractors"""
+    covered, distractors = [], []
+    for line in text.split('\n'):
+        line = _TERM_PREFIX_RE.sub('', _clean_line(line))
+        label, _, term = line.partition(':')
+        term = _clean_line(term)
+        if not term:
+            continue
+        if label.strip().upper() == 'COVERED':
+            covered.append(term)
+        elif label.strip().upper() == 'DISTRACTOR':
+            distractors.append(term)
+    if not covered:
+        raise ValueError("Key terms response was not in the expected format")
+    return covered, distractors
+
+
+def grade_attempt(quiz_data: dict, choice: Optional[str], reflection: str,
+                  selected_terms: List[str]) -> Dict[str, float]:
+    """Grade an attempt locally against the stored answer key"""
+    mcq_correct = int(choice == quiz_data['answer'])
+
+    # Key terms: Jaccard overlap between the selection and the covered terms
+    covered = set(quiz_data['key_terms'])
+    selected = set(selected_terms or [])
+    terms_score = len(covered & selected) / len(covered | selected) if covered | selected else 0.0
+
+    # Reflection: fraction of covered terms the answer mentions
+    reflection_tokens = set(tokenize(reflection or ''))
+    mentioned = [term for term in covered if reflection_tokens & set(tokenize(term))]
+    reflection_score = len(mentioned) / len(covered) if covered else 0.0
+
+    return {
+        'mcq_correct': mcq_correct,
+        'terms_score': terms_score,
+        'reflection_score': reflection_score,
+        'score': (mcq_correct + terms_score + reflection_score) / 3,
+    }
+
+
+def record_attempt(username: str, subject: str, chapter: str, quiz_data: dict,
+                   choice: Optional[str], reflection: str, selected_terms: List[str]) -> Dict[str, float]:
+    """Grade and store an attempt, updating the rollups in the same transaction"""
+    grade = grade_attempt(quiz_data, choice, reflection, selected_terms)
+    now = time.time()
+    quiz = {key: quiz_data[key] for key in ('question', 'options', 'answer', 'key_terms', 'distractors')}
+    responses = {'choice': choice, 'reflection': reflection, 'selected_terms': list(selected_terms or [])}
+
+    conn = connect()
+    try:
+        with conn:
+            c = conn.cursor()
+            row = c.execute('SELECT class_name FROM users WHERE username = ?', (username,)).fetchone()
+            class_name = row[0] if row and row[0] else UNASSIGNED_CLASS
+
+            c.execute('''INSERT INTO quiz_attempts
+                         (username, class_name, subject, chapter, quiz, responses,
+                          mcq_correct, terms_score, reflection_score, score, submitted_at)
+                         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                      (username, class_name, subject, chapter, json.dumps(quiz), json.dumps(responses),
+                       grade['mcq_correct'], grade['terms_score'], grade['reflection_score'],
+                       grade['score'], now))
+            _apply_to_rollups(c, username, class_name, subject, chapter,
+                              grade['mcq_correct'], grade['score'], now)
+    finally:
+        conn.close()
+    return grade
+
+
+def _apply_to_rollups(c: sqlite3.Cursor, username: str, class_name: str, subject: str, chapter: str,
+                      mcq_correct: int, score: float, submitted_at: float) -> None:
+    c.execute('''INSERT OR IGNORE INTO quiz_student_rollups
+                 VALUES (?, ?, ?, ?, 0, 0, 0, 0)''', (subject, chapter, username, class_name))
+    new_student = int(c.rowcount == 1)
+    c.execute('INSERT OR IGNORE INTO quiz_class_members VALUES (?, ?, ?, ?)',
+              (class_name, subject, chapter, username))
+    new_class_student = int(c.rowcount == 1)
+    c.execute('''UPDATE quiz_student_rollups
+                 SET class_name = ?, attempts = attempts + 1, best_score = MAX(best_score, ?),
+                     last_score = ?, last_attempt = ?
+                 WHERE subject = ? AND chapter = ? AND username = ?''',
+              (class_name, score, score, submitted_at, subject, chapter, username))
+    c.execute('''INSERT INTO quiz_chapter_rollups VALUES (?, ?, 1, ?, ?, ?, ?)
+                 ON CONFLICT (subject, chapter) DO UPDATE SET
+                     attempts = attempts + 1,
+                     students = students + excluded.students,
+                     mcq_correct = mcq_correct + excluded.mcq_correct,
+                     score_sum = score_sum + excluded.score_sum,
+                     last_attempt = MAX(last_attempt, excluded.last_attempt)''',
+              (subject, chapter, new_student, mcq_correct, score, submitted_at))
+    c.execute('''INSERT INTO quiz_class_rollups VALUES (?, ?, ?, 1, ?, ?, ?, ?)
+                 ON CONFLICT (class_name, subject, chapter) DO UPDATE SET
+                     attempts = attempts + 1,
+                     students = students + excluded.students,
+                     mcq_correct = mcq_correct + excluded.mcq_correct,
+                     score_sum = score_sum + excluded.score_sum,
+                     last_attempt = MAX(last_attempt, excluded.last_attempt)''',
+              (class_name, subject, chapter, new_class_student, mcq_correct, score, submitted_at))
+
+
+def remove_students(c: sqlite3.Cursor, usernames: List[str]) -> None:
+    """Delete students' attempts and subtract them from the rollups (caller commits)"""
+    c.execute('CREATE TEMP TABLE IF NOT EXISTS removed_students (username TEXT PRIMARY KEY)')
+    c.execute('DELETE FROM removed_students')
+    c.executemany('INSERT OR IGNORE INTO removed_students VALUES (?)', ((name,) for name in usernames))
+    removed = 'username IN (SELECT username FROM removed_students)'
+
+    class_totals = c.execute(f'''SELECT class_name, subject, chapter, COUNT(*), SUM(mcq_correct), SUM(score)
+                                 FROM quiz_attempts WHERE {removed}
+                                 GROUP BY class_name, subject, chapter''').fetchall()
+    class_students = c.execute(f'''SELECT class_name, subject, chapter, COUNT(*)
+                                   FROM quiz_class_members WHERE {removed}
+                                   GROUP BY class_name, subject, chapter''').fetchall()
+    chapter_totals = c.execute(f'''SELECT subject, chapter, COUNT(*), SUM(mcq_correct), SUM(score)
+                                   FROM quiz_attempts WHERE {removed}
+                                   GROUP BY subject, chapter''').fetchall()
+    chapter_students = c.execute(f'''SELECT subject, chapter, COUNT(*)
+                                     FROM quiz_student_rollups WHERE {removed}
+                                     GROUP BY subject, chapter''').fetchall()
+
+    c.execute(f'DELETE FROM quiz_attempts WHERE {removed}')
+    c.execute(f'DELETE FROM quiz_class_members WHERE {removed}')
+    c.execute(f'DELETE FROM quiz_student_rollups WHERE {removed}')
+
+    for class_name, subject, chapter, attempts, mcq_correct, score_sum in class_totals:
+        c.execute('''UPDATE quiz_class_rollups
+                     SET attempts = attempts - ?, mcq_correct = mcq_correct - ?, score_sum = score_sum - ?,
+                         last_attempt = COALESCE((SELECT MAX(submitted_at) FROM quiz_attempts
+                                                  WHERE subject = ? AND chapter = ? AND class_name = ?), 0)
+                     WHERE class_name = ? AND subject = ? AND chapter = ?''',
+                  (attempts, mcq_correct, score_sum, subject, chapter, class_name, class_name, subject, chapter))
+    c.executemany('''UPDATE quiz_class_rollups SET students = students - ?
+                     WHERE class_name = ? AND subject = ? AND chapter = ?''',
+                  ((count, class_name, subject, chapter) for class_name, subject, chapter, count in class_students))
+    for subject, chapter, attempts, mcq_correct, score_sum in chapter_totals:
+        c.execute('''UPDATE quiz_chapter_rollups
+                     SET attempts = attempts - ?, mcq_correct = mcq_correct - ?, score_sum = score_sum - ?,
+                         last_attempt = COALESCE((SELECT MAX(submitted_at) FROM quiz_attempts
+                                                  WHERE subject = ? AND chapter = ?), 0)
+                     WHERE subject = ? AND chapter = ?''',
+                  (attempts, mcq_correct, score_sum, subject, chapter, subject, chapter))
+    c.executemany('''UPDATE quiz_chapter_rollups SET students = students - ?
+                     WHERE subject = ? AND chapter = ?''',
+                  ((count, subject, chapter) for subject, chapter, count in chapter_students))
+
+    c.execute('DELETE FROM quiz_class_rollups WHERE attempts <= 0')
+    c.execute('DELETE FROM quiz_chapter_rollups WHERE attempts <= 0')
+
+
+def rebuild_rollups() -> None:
+    """Recompute every rollup from the raw attempts (recovery only)"""
+    conn = connect()
+    try:
+        with conn:
+            c = conn.cursor()
+            c.execute('DELETE FROM quiz_student_rollups')
+            c.execute('DELETE FROM quiz_class_members')
+            c.execute('DELETE FROM quiz_chapter_rollups')
+            c.execute('DELETE FROM quiz_class_rollups')
+            rows = c.execute('''SELECT username, class_name, subject, chapter, mcq_correct, score, submitted_at
+                                FROM quiz_attempts ORDER BY id''').fetchall()
+            for row in rows:
+                _apply_to_rollups(c, *row)
+    finally:
+        conn.close()
+
+
+def _rollup_rows(query: str, params: tuple = ()) -> List[dict]:
+    conn = connect()
+    try:
+        c = conn.execute(query, params)
+        columns = [column[0] for column in c.description]
+        return [dict(zip(columns, row)) for row in c.fetchall()]
+    finally:
+        conn.close()
+
+
+def chapter_summary_rows() -> List[dict]:
+    """Per-chapter rollups for the instructor dashboard"""
+    return _rollup_rows('''SELECT subject, chapter, attempts, students,
+                                  ROUND(100.0 * mcq_correct / attempts, 1) AS mcq_correct_pct,
+                                  ROUND(100.0 * score_sum / attempts, 1) AS avg_score_pct
+                           FROM quiz_chapter_rollups ORDER BY subject, chapter''')
+
+
+def class_summary_rows(class_name: Optional[str] = None) -> List[dict]:
+    """Per-class, per-chapter rollups for the instructor dashboard"""
+    query = '''SELECT class_name, subject, chapter, attempts, students,
+                      ROUND(100.0 * mcq_correct / attempts, 1) AS mcq_correct_pct,
+                      ROUND(100.0 * score_sum / attempts, 1) AS avg_score_pct
+               FROM quiz_class_rollups'''
+    if class_name is not None:
+        return _rollup_rows(query + ' WHERE class_name = ? ORDER BY subject, chapter', (class_name,))
+    return _rollup_rows(query + ' ORDER BY class_name, subject, chapter')
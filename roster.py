@@ -0,0 +1,198 @@
+"""Bulk class-roster management.
+
+    python roster.py import roster.csv --report credentials.csv
+    python roster.py reset-passwords resets.csv --report credentials.csv
+    python roster.py delete leavers.csv
+
+Input CSVs have a ``username`` column and optionally ``password`` and
+``class_name``. Missing passwords are generated and written to the report.
+"""
+import argparse
+import csv
+import secrets
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set
+
+from auth import DB_PATH, hash_password, init_db
+from quiz import init_quiz_db, remove_students
+
+BATCH_SIZE = 5000
+# Below this many passwords, process pool start-up costs more than it saves
+POOL_THRESHOLD = 1000
+# SQLite's default limit on bound parameters per statement is 999
+LOOKUP_CHUNK = 900
+
+
+def read_roster(path: str) -> List[Dict[str, str]]:
+    """Read roster rows, dropping blank and duplicate usernames (first wins)"""
+    rows, seen = [], set()
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f):
+            username = (row.get('username') or '').strip()
+            if not username or username in seen:
+                continue
+            seen.add(username)
+            rows.append({
+                'username': username,
+                'password': (row.get('password') or '').strip(),
+                'class_name': (row.get('class_name') or row.get('class') or '').strip(),
+            })
+    return rows
+
+
+def write_report(path: str, rows: List[Dict[str, str]]) -> None:
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=['username', 'password', 'class_name', 'status'])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def hash_passwords(passwords: List[str], workers: Optional[int]) -> List[str]:
+    """Hash passwords on a process pool, preserving order"""
+    if workers == 1 or len(passwords) < POOL_THRESHOLD:
+        return [hash_password(password) for password in passwords]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunksize = max(1, len(passwords) // ((workers or 4) * 8))
+        return list(pool.map(hash_password, passwords, chunksize=chunksize))
+
+
+def fill_passwords(rows: List[Dict[str, str]]) -> None:
+    for row in rows:
+        if not row['password']:
+            row['password'] = secrets.token_urlsafe(9)
+
+
+def existing_usernames(conn: sqlite3.Connection, usernames: List[str]) -> Set[str]:
+    found = set()
+    for i in range(0, len(usernames), LOOKUP_CHUNK):
+        chunk = usernames[i:i + LOOKUP_CHUNK]
+        placeholders = ','.join('?' * len(chunk))
+        found.update(row[0] for row in conn.execute(
+            f'SELECT username FROM users WHERE username IN ({placeholders})', chunk))
+    return found
+
+
+def execute_batched(conn: sqlite3.Connection, sql: str, params: Iterable[tuple]) -> int:
+    """Run executemany in BATCH_SIZE transactions; returns rows changed"""
+    params = list(params)
+    changed = 0
+    for i in range(0, len(params), BATCH_SIZE):
+        with conn:
+            changed += conn.executemany(sql, params[i:i + BATCH_SIZE]).rowcount
+    return changed
+
+
+def import_roster(rows: List[Dict[str, str]], workers: Optional[int] = None) -> List[Dict[str, str]]:
+    """Create missing users and update classes of existing ones; safe to re-run"""
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    try:
+        existing = existing_usernames(conn, [row['username'] for row in rows])
+        new_rows = [row for row in rows if row['username'] not in existing]
+        fill_passwords(new_rows)
+        hashes = hash_passwords([row['password'] for row in new_rows], workers)
+
+        execute_batched(conn, 'INSERT OR IGNORE INTO users (username, password, class_name) VALUES (?, ?, ?)',
+                        ((row['username'], hashed, row['class_name'] or None)
+                         for row, hashed in zip(new_rows, hashes)))
+        # A class move keeps past attempts with the class they were made in;
+        # only the student's current class in the quiz rollups follows them
+        moves = [(row['class_name'], row['username'])
+                 for row in rows if row['username'] in existing and row['class_name']]
+        for i in range(0, len(moves), BATCH_SIZE):
+            with conn:
+                conn.executemany('UPDATE users SET class_name = ? WHERE username = ?', moves[i:i + BATCH_SIZE])
+                conn.executemany('UPDATE quiz_student_rollups SET class_name = ? WHERE username = ?',
+                                 moves[i:i + BATCH_SIZE])
+    finally:
+        conn.close()
+
+    return [{
+        'username': row['username'],
+        'password': '' if row['username'] in existing else row['password'],
+        'class_name': row['class_name'],
+        'status': 'exists' if row['username'] in existing else 'created',
+    } for row in rows]
+
+
+def reset_passwords(rows: List[Dict[str, str]], workers: Optional[int] = None) -> List[Dict[str, str]]:
+    """Set new passwords for existing users; unknown usernames are reported, not created"""
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    try:
+        existing = existing_usernames(conn, [row['username'] for row in rows])
+        known = [row for row in rows if row['username'] in existing]
+        fill_passwords(known)
+        hashes = hash_passwords([row['password'] for row in known], workers)
+        execute_batched(conn, 'UPDATE users SET password = ? WHERE username = ?',
+                        ((hashed, row['username']) for row, hashed in zip(known, hashes)))
+    finally:
+        conn.close()
+
+    return [{
+        'username': row['username'],
+        'password': row['password'] if row['username'] in existing else '',
+        'class_name': row['class_name'],
+        'status': 'reset' if row['username'] in existing else 'not found',
+    } for row in rows]
+
+
+def delete_users(rows: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """Delete users and their quiz data; already-deleted users are reported, not an error"""
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    try:
+        # Quiz attempts may outlive an earlier partial deletion, so remove them for every listed user
+        usernames = [row['username'] for row in rows]
+        existing = existing_usernames(conn, usernames)
+        for i in range(0, len(usernames), BATCH_SIZE):
+            batch = usernames[i:i + BATCH_SIZE]
+            with conn:
+                remove_students(conn.cursor(), batch)
+                conn.executemany('DELETE FROM users WHERE username = ?', ((name,) for name in batch))
+    finally:
+        conn.close()
+
+    return [{
+        'username': row['username'],
+        'password': '',
+        'class_name': row['class_name'],
+        'status': 'deleted' if row['username'] in existing else 'not found',
+    } for row in rows]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Bulk class-roster management")
+    parser.add_argument('command', choices=['import', 'reset-passwords', 'delete'])
+    parser.add_argument('csv', help="roster CSV with a username column")
+    parser.add_argument('--report', help="write a credential/status report CSV here")
+    parser.add_argument('--workers', type=int, default=None, help="hashing processes (default: CPU count)")
+    args = parser.parse_args()
+
+    init_db()
+    init_quiz_db()
+    started = time.perf_counter()
+    rows = read_roster(args.csv)
+    if args.command == 'import':
+        report = import_roster(rows, args.workers)
+    elif args.command == 'reset-passwords':
+        report = reset_passwords(rows, args.workers)
+    else:
+        report = delete_users(rows)
+    elapsed = time.perf_counter() - started
+
+    counts: Dict[str, int] = {}
+    for row in report:
+        counts[row['status']] = counts.get(row['status'], 0) + 1
+    summary = ', '.join(f"{status}: {count}" for status, count in sorted(counts.items()))
+    rate = len(report) / elapsed if elapsed > 0 else float('inf')
+    print(f"{args.command}: {len(report)} rows in {elapsed:.2f}s ({rate:,.0f} rows/sec) - {summary}")
+
+    if args.report:
+        write_report(args.report, report)
+        print(f"Report written to {args.report}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
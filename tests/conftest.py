@@ -0,0 +1,32 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+# The app modules live at the repository root rather than in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def quiz_data():
+    return {
+        'question': "What powers the cell?",
+        'options': ["Ribosome", "Mitochondria", "Nucleus", "Golgi"],
+        'answer': "Mitochondria",
+        'key_terms': ["Mitochondria", "ATP"],
+        'distractors': ["Plate tectonics"],
+    }
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A fresh users database shared by auth, quiz and roster"""
+    # auth imports streamlit at module level
+    pytest.importorskip("streamlit")
+    path = str(tmp_path / "users.db")
+    for name in ('auth', 'quiz', 'roster'):
+        monkeypatch.setattr(importlib.import_module(name), 'DB_PATH', path)
+    importlib.import_module('auth').init_db()
+    importlib.import_module('quiz').init_quiz_db()
+    return path
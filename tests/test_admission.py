@@ -0,0 +1,89 @@
+import threading
+import time
+
+from admission import AdmissionController, AnswerCache
+
+
+def test_one_ticket_per_user():
+    controller = AdmissionController(max_in_flight=1, max_queue=4, max_wait=1)
+    ticket, _ = controller.enqueue("alice")
+    duplicate, reason = controller.enqueue("alice")
+    assert ticket is not None
+    assert duplicate is None
+    assert "already" in reason
+
+    controller.release(ticket)
+    again, _ = controller.enqueue("alice")
+    assert again is not None
+
+
+def test_queue_is_capped():
+    controller = AdmissionController(max_in_flight=1, max_queue=2, max_wait=1)
+    running, _ = controller.enqueue("running")
+    queued = [controller.enqueue(f"queued{i}")[0] for i in range(2)]
+    refused, reason = controller.enqueue("overflow")
+
+    assert running.admitted_at is not None
+    assert all(ticket is not None for ticket in queued)
+    assert refused is None
+    assert "capacity" in reason
+    assert controller.stats() == {"in_flight": 1, "queued": 2}
+    assert [controller.position(ticket) for ticket in queued] == [1, 2]
+
+
+def test_release_admits_in_fifo_order():
+    controller = AdmissionController(max_in_flight=1, max_queue=4, max_wait=1)
+    first, _ = controller.enqueue("first")
+    second, _ = controller.enqueue("second")
+    third, _ = controller.enqueue("third")
+
+    assert not controller.wait(second, 0.01)
+    controller.release(first)
+    assert controller.wait(second, 0.01)
+    assert controller.position(third) == 1
+
+    # Withdrawing a queued ticket frees its place without taking a slot
+    controller.release(third)
+    assert controller.stats() == {"in_flight": 1, "queued": 0}
+
+
+def test_in_flight_never_exceeds_limit_under_contention():
+    controller = AdmissionController(max_in_flight=3, max_queue=100, max_wait=5)
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def worker(name):
+        nonlocal active, peak
+        ticket, _ = controller.enqueue(name)
+        assert ticket is not None
+        try:
+            assert controller.wait(ticket, 5)
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.005)
+            with lock:
+                active -= 1
+        finally:
+            controller.release(ticket)
+
+    threads = [threading.Thread(target=worker, args=(f"user{i}",)) for i in range(40)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak <= 3
+    assert controller.stats() == {"in_flight": 0, "queued": 0}
+
+
+def test_answer_cache_normalizes_questions_and_evicts():
+    cache = AnswerCache(max_entries=2)
+    cache.put("Maths", "Algebra", "What is  x?", "x is a variable")
+    assert cache.get("Maths", "Algebra", "what is x?") == "x is a variable"
+
+    cache.put("Maths", "Algebra", "q2", "a2")
+    cache.put("Maths", "Algebra", "q3", "a3")
+    assert cache.get("Maths", "Algebra", "q2") == "a2"
+    assert cache.get("Maths", "Algebra", "what is x?") is None
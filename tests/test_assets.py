@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+
+import pytest
+
+import assets
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    """A fresh images/ tree and an empty per-process asset cache"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(assets, '_cache', {})
+    monkeypatch.setattr(assets, '_loaded', False)
+    os.makedirs(os.path.join('images', 'build'))
+    with open(os.path.join('images', 'logo.png'), 'wb') as f:
+        f.write(b'original image')
+    return tmp_path
+
+
+def write_build(variant=b'optimized', source=b'original image', size=None):
+    with open(os.path.join('images', 'build', 'logo.abc.webp'), 'wb') as f:
+        f.write(variant)
+    manifest = {'images/logo.png': {
+        'file': 'logo.abc.webp',
+        'bytes': len(variant) if size is None else size,
+        'source_bytes': len(source),
+        'source_sha256': hashlib.sha256(source).hexdigest(),
+    }}
+    with open(os.path.join('images', 'build', 'manifest.json'), 'w') as f:
+        json.dump(manifest, f)
+
+
+def test_check_passes_for_fresh_build(tree):
+    write_build()
+    assert assets.check() == []
+
+
+def test_check_reports_missing_manifest_and_budget(tree):
+    assert "No asset manifest" in assets.check()[0]
+    write_build(size=200_000)
+    assert "over the" in assets.check(budget=100_000)[0]
+
+
+def test_check_reports_stale_variant(tree):
+    write_build()
+    with open(os.path.join('images', 'logo.png'), 'wb') as f:
+        f.write(b'replaced image')
+    problems = assets.check()
+    assert len(problems) == 1
+    assert "source changed" in problems[0]
+
+
+def test_asset_bytes_serves_variant(tree):
+    write_build()
+    assert assets.asset_bytes('images/logo.png') == b'optimized'
+
+
+def test_asset_bytes_falls_back_when_variant_is_missing(tree):
+    write_build()
+    os.remove(os.path.join('images', 'build', 'logo.abc.webp'))
+    assert assets.asset_bytes('images/logo.png') == b'original image'
+
+
+def test_asset_bytes_falls_back_when_variant_is_stale(tree):
+    write_build()
+    with open(os.path.join('images', 'logo.png'), 'wb') as f:
+        f.write(b'edited image')
+    assert assets.asset_bytes('images/logo.png') == b'edited image'
+
+
+def test_build_writes_hashed_variants(tree):
+    Image = pytest.importorskip("PIL.Image")
+    Image.new('RGB', (1200, 600), 'red').save(os.path.join('images', 'logo.png'))
+    Image.new('RGBA', (300, 100), (0, 0, 255, 0)).save(os.path.join('images', 'badge.png'))
+
+    manifest = assets.build()
+    entry = manifest['images/logo.png']
+    assert (entry['width'], entry['height']) == (assets.MAX_WIDTH, assets.MAX_WIDTH // 2)
+    assert entry['file'].startswith('logo.') and entry['file'].endswith('.jpg')
+    assert manifest['images/badge.png']['file'].endswith('.png')
+    assert assets.check() == []
+
+
+def test_streamlit_serves_built_variant_unchanged(tree):
+    Image = pytest.importorskip("PIL.Image")
+    image_utils = pytest.importorskip("streamlit.elements.lib.image_utils")
+    layout_utils = pytest.importorskip("streamlit.elements.lib.layout_utils")
+    Image.linear_gradient('L').resize((800, 800)).convert('RGB').save(os.path.join('images', 'logo.png'))
+    Image.new('RGBA', (300, 100), (0, 0, 255, 0)).save(os.path.join('images', 'badge.png'))
+
+    manifest = assets.build()
+    for path, entry in manifest.items():
+        with open(os.path.join('images', 'build', entry['file']), 'rb') as f:
+            variant = f.read()
+        served = assets.asset_bytes(path)
+        assert served == variant and len(served) <= assets.SIZE_BUDGET
+
+        # The same steps st.image applies to raw bytes before handing them to the browser
+        for width in ('content', 'stretch'):
+            image_format = image_utils._validate_image_format_string(served, 'auto')
+            layout = layout_utils.LayoutConfig(width=width)
+            assert image_utils._ensure_image_size_and_format(served, layout, image_format) == variant
@@ -0,0 +1,61 @@
+import pytest
+
+# quiz shares the users database with auth, which needs streamlit
+pytest.importorskip("streamlit")
+
+import quiz  # noqa: E402
+
+
+def set_class(username, class_name):
+    conn = quiz.connect()
+    with conn:
+        conn.execute('INSERT OR REPLACE INTO users (username, password, class_name) VALUES (?, ?, ?)',
+                     (username, 'x', class_name))
+    conn.close()
+
+
+def class_row(class_name):
+    rows = quiz.class_summary_rows(class_name)
+    assert len(rows) == 1
+    return rows[0]
+
+
+def test_parse_quiz_response_accepts_markdown(quiz_data):
+    text = ("**QUESTION:** What powers the cell?\n"
+            "**A:** Ribosome\n**B:** Mitochondria\n**C:** Nucleus\n**D:** Golgi\n\n"
+            "**ANSWER:** B")
+    question, options, answer = quiz.parse_quiz_response(text)
+    assert question == "What powers the cell?"
+    assert options == quiz_data['options']
+    assert answer == "Mitochondria"
+
+
+def test_parse_key_terms_accepts_markdown_and_numbering():
+    covered, distractors = quiz.parse_key_terms(
+        "1. **COVERED:** Mitochondria\n2. COVERED: **ATP**\n- **DISTRACTOR:** Plate tectonics")
+    assert covered == ["Mitochondria", "ATP"]
+    assert distractors == ["Plate tectonics"]
+
+
+def test_grade_attempt(quiz_data):
+    grade = quiz.grade_attempt(quiz_data, "Mitochondria", "mitochondria make energy", ["Mitochondria"])
+    assert grade['mcq_correct'] == 1
+    assert grade['terms_score'] == 0.5
+    assert grade['reflection_score'] == 0.5
+
+
+def test_student_moving_class_is_counted_in_both(db, quiz_data):
+    set_class('alice', 'A')
+    quiz.record_attempt('alice', 'Biology', 'Cells', quiz_data, "Mitochondria", "", [])
+    quiz.record_attempt('alice', 'Biology', 'Cells', quiz_data, "Nucleus", "", [])
+    set_class('alice', 'B')
+    quiz.record_attempt('alice', 'Biology', 'Cells', quiz_data, "Mitochondria", "", [])
+
+    assert (class_row('A')['attempts'], class_row('A')['students']) == (2, 1)
+    assert (class_row('B')['attempts'], class_row('B')['students']) == (1, 1)
+    chapter = quiz.chapter_summary_rows()[0]
+    assert (chapter['attempts'], chapter['students']) == (3, 1)
+
+    before = (quiz.class_summary_rows(), quiz.chapter_summary_rows())
+    quiz.rebuild_rollups()
+    assert (quiz.class_summary_rows(), quiz.chapter_summary_rows()) == before
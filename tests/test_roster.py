@@ -0,0 +1,59 @@
+import pytest
+
+# roster shares the users database with auth, which needs streamlit
+pytest.importorskip("streamlit")
+
+import auth  # noqa: E402
+import quiz  # noqa: E402
+import roster  # noqa: E402
+
+
+def rollups():
+    return quiz.class_summary_rows(), quiz.chapter_summary_rows()
+
+
+def test_import_is_idempotent(db):
+    rows = [{'username': f"s{i}", 'password': '', 'class_name': 'A'} for i in range(5)]
+    first = roster.import_roster([dict(row) for row in rows], workers=1)
+    second = roster.import_roster([dict(row) for row in rows], workers=1)
+
+    assert {row['status'] for row in first} == {'created'}
+    assert all(row['password'] for row in first)
+    assert {row['status'] for row in second} == {'exists'}
+    assert auth.sign_in('s0', first[0]['password'])[0]
+
+
+def test_delete_removes_attempts_and_rollup_contributions(db, quiz_data):
+    roster.import_roster([{'username': name, 'password': 'pw', 'class_name': 'A'}
+                          for name in ('alice', 'bob')], workers=1)
+    quiz.record_attempt('alice', 'Biology', 'Cells', quiz_data, "Mitochondria", "", [])
+    quiz.record_attempt('bob', 'Biology', 'Cells', quiz_data, "Nucleus", "", [])
+    quiz.record_attempt('bob', 'Biology', 'Genetics', quiz_data, "Nucleus", "", [])
+
+    report = roster.delete_users([{'username': 'bob', 'password': '', 'class_name': ''}])
+    assert report[0]['status'] == 'deleted'
+
+    conn = quiz.connect()
+    assert conn.execute("SELECT COUNT(*) FROM quiz_attempts WHERE username = 'bob'").fetchone()[0] == 0
+    conn.close()
+    classes, chapters = rollups()
+    assert [(r['chapter'], r['attempts'], r['students']) for r in chapters] == [('Cells', 1, 1)]
+    assert [(r['chapter'], r['attempts'], r['students']) for r in classes] == [('Cells', 1, 1)]
+
+    # Incremental adjustment matches a full recompute
+    before = rollups()
+    quiz.rebuild_rollups()
+    assert rollups() == before
+
+
+def test_class_reassignment_keeps_history_with_old_class(db, quiz_data):
+    roster.import_roster([{'username': 'alice', 'password': 'pw', 'class_name': 'A'}], workers=1)
+    quiz.record_attempt('alice', 'Biology', 'Cells', quiz_data, "Mitochondria", "", [])
+    roster.import_roster([{'username': 'alice', 'password': '', 'class_name': 'B'}], workers=1)
+    quiz.record_attempt('alice', 'Biology', 'Cells', quiz_data, "Mitochondria", "", [])
+
+    by_class = {r['class_name']: (r['attempts'], r['students']) for r in quiz.class_summary_rows()}
+    assert by_class == {'A': (1, 1), 'B': (1, 1)}
+    conn = quiz.connect()
+    assert conn.execute("SELECT class_name FROM quiz_student_rollups").fetchall() == [('B',)]
+    conn.close()
@@ -0,0 +1,181 @@
+import multiprocessing
+import os
+import random
+from collections import Counter, defaultdict
+
+import pytest
+
+import transcript_index
+from tokenizer import tokenize
+from transcript_index import TranscriptIndex, build_from_catalog
+
+
+def make_transcript(texts, step=5.0):
+    return [{'text': text, 'start': i * step, 'duration': step} for i, text in enumerate(texts)]
+
+
+def all_postings(index):
+    """Merge postings from every shard into {term: {segment: tf}}"""
+    merged = defaultdict(dict)
+    for terms, flat in index._snapshot.shards:
+        for term, (offset, count) in terms.items():
+            pairs = flat[offset * 2:(offset + count) * 2]
+            for segment, tf in zip(pairs[::2], pairs[1::2]):
+                assert segment not in merged[term]
+                merged[term][segment] = tf
+    return merged
+
+
+def brute_force_postings(documents):
+    expected = defaultdict(dict)
+    segment = 0
+    for texts in documents:
+        for text in texts:
+            for term, tf in Counter(tokenize(text)).items():
+                expected[term][segment] = tf
+            segment += 1
+    return expected
+
+
+def add_chapters(path, writer):
+    index = TranscriptIndex(path)
+    for i in range(15):
+        index.add("Subject", f"Chapter {writer}-{i}", f"vid{writer}x{i}",
+                  make_transcript([f"common words marker{writer}x{i}", "more common words"]))
+
+
+def test_add_is_idempotent_and_search_returns_location(tmp_path):
+    index = TranscriptIndex(str(tmp_path))
+    transcript = make_transcript(["Cells divide by mitosis", "The nucleus holds DNA"])
+
+    assert index.add("Biology", "Cell Biology", "vid1", transcript)
+    assert not index.add("Biology", "Cell Biology", "vid1", transcript)
+    assert index.has("vid1")
+
+    results = index.search("nucleus")
+    assert len(results) == 1
+    assert results[0]['subject'] == "Biology"
+    assert results[0]['chapter'] == "Cell Biology"
+    assert results[0]['video_id'] == "vid1"
+    assert results[0]['start'] == 5.0
+    assert results[0]['text'] == "The nucleus holds DNA"
+
+
+def test_search_ranks_rarer_and_more_frequent_terms_higher(tmp_path):
+    index = TranscriptIndex(str(tmp_path))
+    index.add("Physics", "Optics", "v1", make_transcript([
+        "light travels in straight lines",
+        "refraction bends light refraction at a boundary",
+        "light is fast",
+        "lenses focus light",
+    ]))
+    index.add("Physics", "Mechanics", "v2", make_transcript([
+        "refraction is not covered here",
+        "forces cause acceleration",
+    ]))
+
+    results = index.search("refraction light")
+    assert results[0]['text'] == "refraction bends light refraction at a boundary"
+    assert {r['chapter'] for r in results} == {"Optics", "Mechanics"}
+    assert index.search("the of and") == []
+    assert index.search("quasar") == []
+
+
+def test_compaction_preserves_postings(tmp_path, monkeypatch):
+    monkeypatch.setattr(transcript_index, 'MAX_SHARDS', 2)
+    rng = random.Random(7)
+    vocabulary = [f"term{i}" for i in range(40)]
+    documents = [[" ".join(rng.choices(vocabulary, k=6)) for _ in range(rng.randint(1, 20))]
+                 for _ in range(12)]
+
+    index = TranscriptIndex(str(tmp_path))
+    for i, texts in enumerate(documents):
+        index.add("Subject", f"Chapter {i}", f"vid{i}", make_transcript(texts))
+        assert len(index._snapshot.meta['shards']) <= 3
+
+    assert all_postings(index) == brute_force_postings(documents)
+
+    # Retired shard files are removed
+    shard_files = {name.rsplit('.', 1)[0] for name in os.listdir(str(tmp_path)) if name.startswith('shard-')}
+    assert shard_files == set(index._snapshot.meta['shards'])
+
+
+def test_reopen_and_recover_from_interrupted_write(tmp_path):
+    index = TranscriptIndex(str(tmp_path))
+    index.add("History", "Renaissance", "v1", make_transcript(["painters in florence"]))
+    before = index.search("florence")
+
+    # Simulate a crash after appending to the data files but before meta.json was saved
+    for name in ('text.bin', 'segments.bin', 'lengths.bin'):
+        with open(os.path.join(str(tmp_path), name), 'ab') as f:
+            f.write(b'\xff' * 7)
+
+    reopened = TranscriptIndex(str(tmp_path))
+    assert reopened.search("florence") == before
+
+    reopened.add("History", "Middle Ages", "v2", make_transcript(["castles and florence merchants"]))
+    again = TranscriptIndex(str(tmp_path))
+    texts = sorted(result['text'] for result in again.search("florence"))
+    assert texts == ["castles and florence merchants", "painters in florence"]
+    assert os.path.getsize(os.path.join(str(tmp_path), 'lengths.bin')) == 2 * 2
+
+
+def test_build_from_catalog_indexes_every_chapter(tmp_path):
+    index = TranscriptIndex(str(tmp_path))
+    fetched = []
+
+    def fetch(video_id):
+        fetched.append(video_id)
+        return make_transcript([f"lesson {video_id}"])
+
+    counts = build_from_catalog(index, fetch)
+    assert counts['failed'] == 0
+    assert counts['added'] == len(fetched) == len(set(fetched)) > 0
+    # Chapters sharing a video (Literature's Fiction and Non-Fiction) are indexed once
+    assert counts['skipped'] == 1
+    total = counts['added'] + counts['skipped']
+    assert build_from_catalog(index, fetch) == {'added': 0, 'skipped': total, 'failed': 0}
+
+
+def test_shared_video_is_indexed_once(tmp_path):
+    index = TranscriptIndex(str(tmp_path))
+    transcript = make_transcript(["an unreliable narrator"])
+    assert index.add("Literature", "Fiction", "shared", transcript)
+    assert not index.add("Literature", "Non-Fiction", "shared", transcript)
+
+    results = index.search("narrator")
+    assert [(r['chapter'], r['video_id']) for r in results] == [("Fiction", "shared")]
+
+
+def test_reader_sees_chapters_added_by_another_process(tmp_path):
+    app = TranscriptIndex(str(tmp_path))
+    app.add("Physics", "Optics", "v1", make_transcript(["light bends"]))
+    assert app.search("gravity") == []
+
+    # A separate `python transcript_index.py build` has its own TranscriptIndex
+    builder = TranscriptIndex(str(tmp_path))
+    builder.add("Physics", "Gravity", "v2", make_transcript(["gravity pulls"]))
+
+    assert app.has("v2")
+    assert [r['chapter'] for r in app.search("gravity")] == ["Gravity"]
+    app.add("Physics", "Waves", "v3", make_transcript(["light waves"]))
+    assert {r['video_id'] for r in TranscriptIndex(str(tmp_path)).search("light gravity")} == {"v1", "v2", "v3"}
+
+
+@pytest.mark.skipif(transcript_index.fcntl is None, reason="cross-process locking needs fcntl")
+def test_concurrent_writers_in_separate_processes(tmp_path, monkeypatch):
+    monkeypatch.setattr(transcript_index, 'MAX_SHARDS', 3)
+    writers = [multiprocessing.Process(target=add_chapters, args=(str(tmp_path), writer)) for writer in range(3)]
+    for process in writers:
+        process.start()
+    for process in writers:
+        process.join()
+        assert process.exitcode == 0
+
+    index = TranscriptIndex(str(tmp_path))
+    assert len(index._snapshot.meta['docs']) == 45
+    for writer in range(3):
+        for i in range(15):
+            results = index.search(f"marker{writer}x{i}")
+            assert [(r['video_id'], r['start']) for r in results] == [(f"vid{writer}x{i}", 0.0)]
+    assert len(index.search("common", limit=100)) == 90
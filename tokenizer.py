@@ -0,0 +1,15 @@
+import re
+from typing import List
+
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have he her his i if in into is it its
+me my no not of on or our she so that the their them then there these they this
+to was we were what when which who will with you your um uh
+""".split())
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords removed"""
+    return [t for t in _TOKEN_RE.findall(text.lower().replace("'", "")) if t not in STOPWORDS]
@@ -0,0 +1,323 @@
+"""Inverted index over lesson transcripts.
+
+Transcripts are added as students open chapters; to index the whole
+catalog up front run:
+
+    python transcript_index.py build
+
+The build can run while the app is up: writers take an exclusive lock on
+the index directory, and readers pick up the new state when meta.json
+changes.
+"""
+import argparse
+import contextlib
+import heapq
+import json
+import math
+import mmap
+import os
+import sys
+import threading
+import time
+from array import array
+from collections import defaultdict
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process lock applies
+    fcntl = None
+
+from catalog import chapter_videos, get_video_id, subject_chapters
+from tokenizer import tokenize
+
+# On-disk layout (all append-only except meta.json and compaction):
+#   meta.json        documents (one per video), shard list and committed sizes
+#   lock             flock target serializing writers across processes
+#   text.bin         UTF-8 segment text, concatenated
+#   segments.bin     uint32 [text_offset, text_len, start_ms, doc] per segment
+#   lengths.bin      uint16 token count per segment (for BM25 length norm)
+#   <shard>.terms    JSON {term: [offset, count]} into the shard postings
+#   <shard>.post     uint32 [segment, tf] pairs, grouped by term
+SEGMENT_FIELDS = 4
+MAX_SHARDS = 8
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+def _map_file(path: str) -> Optional[mmap.mmap]:
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return None
+    with open(path, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _view(mapped: Optional[mmap.mmap], typecode: str, count: int) -> memoryview:
+    if mapped is None:
+        return memoryview(array(typecode))
+    return memoryview(mapped)[:count * array(typecode).itemsize].cast(typecode)
+
+
+class _Snapshot:
+    """Memory-mapped, read-only view of the index at one committed state"""
+
+    def __init__(self, path: str, meta: dict, previous: Optional['_Snapshot'] = None,
+                 version: Optional[Tuple[int, int]] = None):
+        self.meta = meta
+        self.version = version
+        self.terms: Dict[str, Dict[str, List[int]]] = {}
+        n = meta['segments']
+        self._maps = [_map_file(os.path.join(path, name)) for name in ('text.bin', 'segments.bin', 'lengths.bin')]
+        self.text = self._maps[0]
+        self.segments = _view(self._maps[1], 'I', n * SEGMENT_FIELDS)
+        self.lengths = _view(self._maps[2], 'H', n)
+        self.shards: List[Tuple[Dict[str, List[int]], memoryview]] = []
+        for shard in meta['shards']:
+            # Shards are immutable, so term dictionaries can be reused across snapshots
+            terms = previous.terms.get(shard) if previous is not None else None
+            if terms is None:
+                with open(os.path.join(path, shard + '.terms'), encoding='utf-8') as f:
+                    terms = json.load(f)
+            self.terms[shard] = terms
+            postings_map = _map_file(os.path.join(path, shard + '.post'))
+            self._maps.append(postings_map)
+            size = sum(count for _, count in terms.values()) * 2
+            self.shards.append((terms, _view(postings_map, 'I', size)))
+
+    def segment(self, index: int) -> Tuple[str, float, int]:
+        base = index * SEGMENT_FIELDS
+        offset, length, start_ms, doc = self.segments[base:base + SEGMENT_FIELDS]
+        text = self.text[offset:offset + length].decode('utf-8') if self.text is not None else ""
+        return text, start_ms / 1000, doc
+
+
+class TranscriptIndex:
+    """Inverted index over transcript segments from every cached chapter video"""
+
+    def __init__(self, path: str = 'transcript_index'):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        with self._file_lock(exclusive=False):
+            self._snapshot = _Snapshot(path, self._load_meta(), version=self._meta_version())
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    @contextlib.contextmanager
+    def _file_lock(self, exclusive: bool) -> Iterator[None]:
+        """Hold the lock shared by every process using this index directory"""
+        with open(self._file('lock'), 'a') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+
+    def _meta_version(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self._file('meta.json'))
+        except FileNotFoundError:
+            return None
+        # meta.json is replaced on every save, so the inode changes even when mtime does not
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _current(self) -> _Snapshot:
+        """The latest snapshot, reloaded if another process has changed the index"""
+        snapshot = self._snapshot
+        if self._meta_version() == snapshot.version:
+            return snapshot
+        with self._lock, self._file_lock(exclusive=False):
+            if self._meta_version() != self._snapshot.version:
+                self._snapshot = _Snapshot(self.path, self._load_meta(), self._snapshot, self._meta_version())
+            return self._snapshot
+
+    def _load_meta(self) -> dict:
+        try:
+            with open(self._file('meta.json'), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'docs': [], 'shards': [], 'segments': 0, 'text_bytes': 0,
+                    'total_tokens': 0, 'next_shard': 0}
+
+    def _save_meta(self, meta: dict) -> None:
+        tmp = self._file('meta.json.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._file('meta.json'))
+
+    def has(self, video_id: str) -> bool:
+        return any(doc['video_id'] == video_id for doc in self._current().meta['docs'])
+
+    def add(self, subject: str, chapter: str, video_id: str, transcript: List[dict]) -> bool:
+        """Index a chapter video's transcript; returns False if the video was already indexed"""
+        with self._lock, self._file_lock(exclusive=True):
+            meta = self._load_meta()
+            # Chapters that share a video are indexed once, under the first chapter added
+            if any(doc['video_id'] == video_id for doc in meta['docs']):
+                return False
+
+            doc = len(meta['docs'])
+            first_segment = meta['segments']
+            text_offset = meta['text_bytes']
+            text_blob = bytearray()
+            segments = array('I')
+            lengths = array('H')
+            postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+            total_tokens = 0
+
+            for i, item in enumerate(transcript):
+                encoded = item['text'].encode('utf-8')
+                tokens = tokenize(item['text'])
+                segments.extend((text_offset + len(text_blob), len(encoded), int(item['start'] * 1000), doc))
+                lengths.append(min(len(tokens), 0xFFFF))
+                text_blob += encoded
+                counts: Dict[str, int] = defaultdict(int)
+                for token in tokens:
+                    counts[token] += 1
+                for token, tf in counts.items():
+                    postings[token].append((first_segment + i, min(tf, 0xFFFF)))
+                total_tokens += len(tokens)
+
+            # Drop any uncommitted tail left by an interrupted write, then append
+            self._append(self._file('text.bin'), meta['text_bytes'], text_blob)
+            self._append(self._file('segments.bin'), meta['segments'] * SEGMENT_FIELDS * 4, segments.tobytes())
+            self._append(self._file('lengths.bin'), meta['segments'] * 2, lengths.tobytes())
+
+            shard = f"shard-{meta['next_shard']:06d}"
+            self._write_shard(shard, postings)
+
+            meta['docs'].append({'subject': subject, 'chapter': chapter, 'video_id': video_id})
+            meta['shards'].append(shard)
+            meta['next_shard'] += 1
+            meta['segments'] += len(transcript)
+            meta['text_bytes'] += len(text_blob)
+            meta['total_tokens'] += total_tokens
+            self._save_meta(meta)
+
+            if len(meta['shards']) > MAX_SHARDS:
+                self._compact(meta)
+            self._snapshot = _Snapshot(self.path, meta, self._snapshot, self._meta_version())
+            return True
+
+    @staticmethod
+    def _append(path: str, committed: int, data: bytes) -> None:
+        with open(path, 'ab') as f:
+            f.truncate(committed)
+            f.write(data)
+
+    def _write_shard(self, shard: str, postings: Dict[str, List[Tuple[int, int]]]) -> None:
+        terms = {}
+        flat = array('I')
+        for term in sorted(postings):
+            entries = postings[term]
+            terms[term] = [len(flat) // 2, len(entries)]
+            for segment, tf in entries:
+                flat.extend((segment, tf))
+        with open(self._file(shard + '.post'), 'wb') as f:
+            flat.tofile(f)
+        with open(self._file(shard + '.terms'), 'w', encoding='utf-8') as f:
+            f.write(json.dumps(terms, separators=(',', ':')))
+
+    def _compact(self, meta: dict) -> None:
+        """Merge the newest shards, size-tiered so large shards are rewritten rarely"""
+        sizes = [os.path.getsize(self._file(name + '.post')) for name in meta['shards']]
+        start = 0
+        while len(sizes) - start > 2 and sizes[start] > sum(sizes[start + 1:]):
+            start += 1
+        retired = meta['shards'][start:]
+
+        old = _Snapshot(self.path, dict(meta, shards=retired), self._snapshot)
+        merged: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        for terms, flat in old.shards:
+            for term, (offset, count) in terms.items():
+                pairs = flat[offset * 2:(offset + count) * 2]
+                merged[term].extend(zip(pairs[::2], pairs[1::2]))
+        shard = f"shard-{meta['next_shard']:06d}"
+        self._write_shard(shard, merged)
+        meta['shards'] = meta['shards'][:start] + [shard]
+        meta['next_shard'] += 1
+        self._save_meta(meta)
+        for name in retired:
+            for suffix in ('.terms', '.post'):
+                try:
+                    os.remove(self._file(name + suffix))
+                except OSError:
+                    pass
+
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        """Return the best matching segments ranked by BM25"""
+        snapshot = self._current()
+        total = snapshot.meta['segments']
+        terms = set(tokenize(query))
+        if not total or not terms:
+            return []
+        avg_length = max(snapshot.meta['total_tokens'] / total, 1.0)
+        lengths = snapshot.lengths
+
+        scores: Dict[int, float] = defaultdict(float)
+        for term in terms:
+            matches = [(flat, offset, count) for shard_terms, flat in snapshot.shards
+                       for offset, count in [shard_terms.get(term, (0, 0))] if count]
+            df = sum(count for _, _, count in matches)
+            if not df:
+                continue
+            idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+            for flat, offset, count in matches:
+                pairs = flat[offset * 2:(offset + count) * 2]
+                for segment, tf in zip(pairs[::2], pairs[1::2]):
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[segment] / avg_length)
+                    scores[segment] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        docs = snapshot.meta['docs']
+        results = []
+        for segment, score in heapq.nlargest(limit, scores.items(), key=lambda item: item[1]):
+            text, start, doc = snapshot.segment(segment)
+            results.append({
+                'subject': docs[doc]['subject'],
+                'chapter': docs[doc]['chapter'],
+                'video_id': docs[doc]['video_id'],
+                'start': start,
+                'text': text,
+                'score': score,
+            })
+        return results
+
+
+def build_from_catalog(index: TranscriptIndex,
+                       fetch: Optional[Callable[[str], List[dict]]] = None) -> Dict[str, int]:
+    """Index every chapter video in the catalog that is not indexed yet"""
+    if fetch is None:
+        from youtube_transcript_api import YouTubeTranscriptApi
+        fetch = YouTubeTranscriptApi.get_transcript
+
+    counts = {'added': 0, 'skipped': 0, 'failed': 0}
+    for subject, chapters in subject_chapters.items():
+        for chapter, video_url in zip(chapters, chapter_videos[subject]):
+            video_id = get_video_id(video_url)
+            if index.has(video_id):
+                counts['skipped'] += 1
+                continue
+            try:
+                transcript = fetch(video_id)
+            except Exception as e:
+                print(f"{subject} - {chapter['title']}: transcript not available ({e})", file=sys.stderr)
+                counts['failed'] += 1
+                continue
+            index.add(subject, chapter['title'], video_id, transcript)
+            counts['added'] += 1
+    return counts
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build the lesson transcript search index")
+    parser.add_argument('command', choices=['build'])
+    parser.add_argument('--path', default='transcript_index', help="index directory")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    counts = build_from_catalog(TranscriptIndex(args.path))
+    print(f"added: {counts['added']}, already indexed: {counts['skipped']}, "
+          f"failed: {counts['failed']} in {time.perf_counter() - started:.1f}s")
+    return 1 if counts['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())